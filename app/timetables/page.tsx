@@ -15,7 +15,7 @@ interface Timetable {
   semester: string
   department: string
   status: "draft" | "generating" | "completed" | "failed"
-  algorithm: "greedy" | "backtracking" | "csp"
+  algorithm: "greedy" | "backtracking" | "csp" | "local_search" | "portfolio"
   created_at: string
   quality_score?: number
   conflicts?: number
@@ -142,6 +142,8 @@ export default function TimetablesPage() {
       greedy: "bg-orange-100 text-orange-800",
       backtracking: "bg-purple-100 text-purple-800",
       csp: "bg-blue-100 text-blue-800",
+      local_search: "bg-green-100 text-green-800",
+      portfolio: "bg-teal-100 text-teal-800",
     }
     return colors[algorithm as keyof typeof colors] || "bg-gray-100 text-gray-800"
   }
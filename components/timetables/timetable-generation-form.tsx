@@ -72,6 +72,18 @@ export function TimetableGenerationForm({ onGenerate }: TimetableGenerationFormP
       time: "~1-3 minutes",
       quality: "Excellent",
     },
+    local_search: {
+      name: "Local Search",
+      description: "Improves a greedy timetable within a fixed time budget. Predictable run time.",
+      time: "~2 seconds",
+      quality: "Very Good",
+    },
+    portfolio: {
+      name: "Portfolio",
+      description: "Races several strategies in parallel and keeps the best timetable found in time.",
+      time: "~10 seconds",
+      quality: "Excellent",
+    },
   }
 
   return (
@@ -127,7 +127,7 @@ export interface FacultyAvailability {
 }
 
 export interface TimetableGenerationRequest {
-  algorithm: "greedy" | "backtracking" | "constraint_satisfaction"
+  algorithm: "greedy" | "backtracking" | "constraint_satisfaction" | "local_search" | "portfolio"
   institution_id: string
   semester: number
   academic_year: string
@@ -1,120 +1,123 @@
 import { createClient } from "@/lib/supabase/server"
 import type { TimetableGenerationRequest, TimetableGenerationResult } from "@/lib/types/timetable"
+import { runSolverJob, type SolverJob, type SolverProgress, type SolverScheduleEntry } from "@/lib/utils/timetable-solver"
 
-export async function generateTimetable(request: TimetableGenerationRequest): Promise<TimetableGenerationResult> {
+type SupabaseClient = Awaited<ReturnType<typeof createClient>>
+
+// Solver input for a generation request, in the shape timetable_io.load_job reads
+async function buildAlgorithmData(
+  supabase: SupabaseClient,
+  request: TimetableGenerationRequest,
+): Promise<SolverJob> {
+  // Fetch required data from database
+  const [coursesResult, facultyResult, roomsResult, timeSlotsResult, enrollmentsResult] = await Promise.all([
+    supabase
+      .from("courses")
+      .select(`
+        *,
+        course_faculty!inner(faculty_id, is_primary),
+        departments(name, code)
+      `)
+      .eq("institution_id", request.institution_id)
+      .eq("semester", request.semester)
+      .in("id", request.courses),
+
+    supabase
+      .from("faculty")
+      .select(`
+        *,
+        faculty_availability(time_slot_id, is_available, preference_level)
+      `)
+      .eq("institution_id", request.institution_id),
+
+    supabase.from("rooms").select("*").eq("institution_id", request.institution_id),
+
+    supabase.from("time_slots").select("*").eq("institution_id", request.institution_id).eq("is_active", true),
+
+    supabase
+      .from("student_courses")
+      .select("student_id, course_id")
+      .eq("status", "enrolled")
+      .in("course_id", request.courses),
+  ])
+
+  if (coursesResult.error) throw coursesResult.error
+  if (facultyResult.error) throw facultyResult.error
+  if (roomsResult.error) throw roomsResult.error
+  if (timeSlotsResult.error) throw timeSlotsResult.error
+  if (enrollmentsResult.error) throw enrollmentsResult.error
+
+  // Transform data for Python algorithm
+  return {
+    algorithm: request.algorithm,
+    courses:
+      coursesResult.data?.map((course) => ({
+        id: course.id,
+        course_code: course.course_code,
+        course_name: course.course_name,
+        credits: course.credits,
+        semester: course.semester,
+        course_type: course.course_type,
+        faculty_id: course.course_faculty?.[0]?.faculty_id,
+        required_room_type: course.course_type === "practical" ? "laboratory" : "lecture_hall",
+        min_capacity: 30, // Default minimum capacity
+      })) || [],
+
+    faculty:
+      facultyResult.data?.map((faculty) => ({
+        id: faculty.id,
+        name: faculty.name,
+        department_id: faculty.department_id,
+        max_hours_per_week: faculty.max_hours_per_week,
+        specialization: faculty.specialization,
+        availability:
+          faculty.faculty_availability?.reduce((acc: Record<string, number>, avail: any) => {
+            if (avail.is_available) {
+              acc[avail.time_slot_id] = avail.preference_level
+            }
+            return acc
+          }, {}) || {},
+      })) || [],
+
+    rooms:
+      roomsResult.data?.map((room) => ({
+        id: room.id,
+        room_number: room.room_number,
+        capacity: room.capacity,
+        room_type: room.room_type,
+        equipment: room.equipment,
+      })) || [],
+
+    time_slots:
+      timeSlotsResult.data?.map((slot) => ({
+        id: slot.id,
+        day_of_week: slot.day_of_week,
+        start_time: slot.start_time,
+        end_time: slot.end_time,
+        slot_name: slot.slot_name,
+      })) || [],
+
+    // Courses sharing a student are never scheduled in the same time slot
+    student_courses:
+      enrollmentsResult.data?.map((enrollment) => ({
+        student_id: enrollment.student_id,
+        course_id: enrollment.course_id,
+      })) || [],
+  }
+}
+
+export async function generateTimetable(
+  request: TimetableGenerationRequest,
+  onProgress?: (progress: SolverProgress) => void,
+): Promise<TimetableGenerationResult> {
   const supabase = await createClient()
 
   try {
-    // Fetch required data from database
-    const [coursesResult, facultyResult, roomsResult, timeSlotsResult] = await Promise.all([
-      supabase
-        .from("courses")
-        .select(`
-          *,
-          course_faculty!inner(faculty_id, is_primary),
-          departments(name, code)
-        `)
-        .eq("institution_id", request.institution_id)
-        .eq("semester", request.semester)
-        .in("id", request.courses),
-
-      supabase
-        .from("faculty")
-        .select(`
-          *,
-          faculty_availability(time_slot_id, is_available, preference_level)
-        `)
-        .eq("institution_id", request.institution_id),
-
-      supabase.from("rooms").select("*").eq("institution_id", request.institution_id),
-
-      supabase.from("time_slots").select("*").eq("institution_id", request.institution_id).eq("is_active", true),
-    ])
-
-    if (coursesResult.error) throw coursesResult.error
-    if (facultyResult.error) throw facultyResult.error
-    if (roomsResult.error) throw roomsResult.error
-    if (timeSlotsResult.error) throw timeSlotsResult.error
-
-    // Transform data for Python algorithm
-    const algorithmData = {
-      algorithm: request.algorithm,
-      courses:
-        coursesResult.data?.map((course) => ({
-          id: course.id,
-          course_code: course.course_code,
-          course_name: course.course_name,
-          credits: course.credits,
-          semester: course.semester,
-          course_type: course.course_type,
-          faculty_id: course.course_faculty?.[0]?.faculty_id,
-          required_room_type: course.course_type === "practical" ? "laboratory" : "lecture_hall",
-          min_capacity: 30, // Default minimum capacity
-        })) || [],
-
-      faculty:
-        facultyResult.data?.map((faculty) => ({
-          id: faculty.id,
-          name: faculty.name,
-          department_id: faculty.department_id,
-          max_hours_per_week: faculty.max_hours_per_week,
-          specialization: faculty.specialization,
-          availability:
-            faculty.faculty_availability?.reduce((acc: Record<string, number>, avail: any) => {
-              if (avail.is_available) {
-                acc[avail.time_slot_id] = avail.preference_level
-              }
-              return acc
-            }, {}) || {},
-        })) || [],
-
-      rooms:
-        roomsResult.data?.map((room) => ({
-          id: room.id,
-          room_number: room.room_number,
-          capacity: room.capacity,
-          room_type: room.room_type,
-          equipment: room.equipment,
-        })) || [],
-
-      time_slots:
-        timeSlotsResult.data?.map((slot) => ({
-          id: slot.id,
-          day_of_week: slot.day_of_week,
-          start_time: slot.start_time,
-          end_time: slot.end_time,
-          slot_name: slot.slot_name,
-        })) || [],
-    }
+    const algorithmData = await buildAlgorithmData(supabase, request)
 
-    // Call Python algorithm (this would typically be done via API call or subprocess)
-    // For now, we'll simulate the response
-    const result: TimetableGenerationResult = {
-      success: true,
-      algorithm: request.algorithm,
-      schedule: [],
-      metrics: {
-        faculty_workload: {
-          average_hours: 0,
-          max_hours: 0,
-          min_hours: 0,
-          workload_variance: 0,
-        },
-        room_utilization: {
-          total_rooms_used: 0,
-          average_usage: 0,
-          max_usage: 0,
-        },
-        time_distribution: {
-          total_slots_used: 0,
-          average_classes_per_slot: 0,
-        },
-        overall_score: 0,
-      },
-      total_courses: algorithmData.courses.length,
-      scheduled_courses: 0,
-      success_rate: 0,
-    }
+    // Solve in the long-running Python solver service
+    const result = await runSolverJob(algorithmData, onProgress)
+    if (!result.success) throw new Error(result.error || "Timetable generation failed")
 
     return result
   } catch (error) {
@@ -137,6 +140,39 @@ export async function generateTimetable(request: TimetableGenerationRequest): Pr
   }
 }
 
+// Rows per insert request when saving timetable entries
+const ENTRY_BATCH_SIZE = 500
+
+export async function insertTimetableEntries(
+  supabase: SupabaseClient,
+  timetableId: string,
+  schedule: Iterable<SolverScheduleEntry>,
+) {
+  let batch: SolverScheduleEntry[] = []
+
+  const flush = async () => {
+    if (batch.length === 0) return
+    const { error } = await supabase.from("timetable_entries").insert(
+      batch.map((entry) => ({
+        timetable_id: timetableId,
+        course_id: entry.course_id,
+        faculty_id: entry.faculty_id,
+        room_id: entry.room_id,
+        time_slot_id: entry.time_slot_id,
+        entry_type: "regular" as const,
+      })),
+    )
+    if (error) throw error
+    batch = []
+  }
+
+  for (const entry of schedule) {
+    batch.push(entry)
+    if (batch.length === ENTRY_BATCH_SIZE) await flush()
+  }
+  await flush()
+}
+
 export async function saveTimetable(
   institutionId: string,
   name: string,
@@ -169,21 +205,8 @@ export async function saveTimetable(
 
     if (timetableError) throw timetableError
 
-    // Create timetable entries
-    if (generationResult.schedule.length > 0) {
-      const entries = generationResult.schedule.map((entry) => ({
-        timetable_id: timetable.id,
-        course_id: entry.course_id,
-        faculty_id: entry.faculty_id,
-        room_id: entry.room_id,
-        time_slot_id: entry.time_slot_id,
-        entry_type: "regular" as const,
-      }))
-
-      const { error: entriesError } = await supabase.from("timetable_entries").insert(entries)
-
-      if (entriesError) throw entriesError
-    }
+    // Create timetable entries in batches so large schedules stay under request size limits
+    await insertTimetableEntries(supabase, timetable.id, generationResult.schedule)
 
     return { success: true, timetable_id: timetable.id }
   } catch (error) {
@@ -194,3 +217,77 @@ export async function saveTimetable(
     }
   }
 }
+
+// Generates a timetable and saves it while the solver streams the schedule, so
+// neither the solver result nor this process holds every entry at once
+export async function generateAndSaveTimetable(
+  request: TimetableGenerationRequest,
+  name: string,
+  onProgress?: (progress: SolverProgress) => void,
+) {
+  const supabase = await createClient()
+  let timetableId: string | null = null
+
+  try {
+    const algorithmData = await buildAlgorithmData(supabase, request)
+
+    const { data: timetable, error: timetableError } = await supabase
+      .from("timetables")
+      .insert({
+        institution_id: request.institution_id,
+        name,
+        academic_year: request.academic_year,
+        semester: request.semester,
+        status: "draft",
+        generated_by: request.algorithm,
+        generation_metadata: {},
+      })
+      .select()
+      .single()
+
+    if (timetableError) throw timetableError
+    timetableId = timetable.id
+
+    // Batches are inserted one after another as they arrive; the first failure stops the rest
+    let inserts = Promise.resolve()
+    let insertError: unknown = null
+    const result = await runSolverJob(
+      { ...algorithmData, options: { schedule_chunk_size: ENTRY_BATCH_SIZE } },
+      onProgress,
+      (entries) => {
+        inserts = inserts
+          .then(() => (insertError ? undefined : insertTimetableEntries(supabase, timetable.id, entries)))
+          .catch((error) => {
+            insertError = insertError ?? error
+          })
+      },
+    )
+    await inserts
+    if (insertError) throw insertError
+    if (!result.success) throw new Error(result.error || "Timetable generation failed")
+
+    const { error: updateError } = await supabase
+      .from("timetables")
+      .update({
+        generation_metadata: {
+          metrics: result.metrics,
+          success_rate: result.success_rate,
+          total_courses: result.total_courses,
+          scheduled_courses: result.scheduled_courses,
+        },
+      })
+      .eq("id", timetable.id)
+
+    if (updateError) throw updateError
+
+    return { success: true, timetable_id: timetable.id, result }
+  } catch (error) {
+    console.error("Error generating and saving timetable:", error)
+    // Entries already inserted go with the timetable (ON DELETE CASCADE)
+    if (timetableId) await supabase.from("timetables").delete().eq("id", timetableId)
+    return {
+      success: false,
+      error: error instanceof Error ? error.message : "Unknown error occurred",
+    }
+  }
+}
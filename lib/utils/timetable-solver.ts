@@ -0,0 +1,122 @@
+import { spawn, type ChildProcessWithoutNullStreams } from "child_process"
+import { promises as fs } from "fs"
+import os from "os"
+import path from "path"
+import readline from "readline"
+import type { TimetableGenerationResult } from "@/lib/types/timetable"
+
+// Client for scripts/timetable_service.py: one long-running Python process that
+// receives jobs as JSON lines and streams progress events and results back
+
+export interface SolverProgress {
+  placed: number
+  total: number
+  nodes: number
+  best_score: number | null
+}
+
+export interface SolverJob {
+  algorithm: string
+  courses: unknown[]
+  faculty: unknown[]
+  rooms: unknown[]
+  time_slots: unknown[]
+  student_courses?: unknown[]
+  options?: {
+    decompose?: boolean
+    max_workers?: number
+    // Stream the schedule as batches of this many entries instead of in the result
+    schedule_chunk_size?: number
+  }
+}
+
+export type SolverScheduleEntry = TimetableGenerationResult["schedule"][number]
+
+interface PendingJob {
+  resolve: (result: TimetableGenerationResult) => void
+  reject: (error: Error) => void
+  onProgress?: (progress: SolverProgress) => void
+  onEntries?: (entries: SolverScheduleEntry[]) => void
+}
+
+const pythonBin = process.env.TIMETABLE_PYTHON || "python3"
+const servicePath = path.join(process.cwd(), "scripts", "timetable_service.py")
+
+let solver: ChildProcessWithoutNullStreams | null = null
+let nextJobId = 0
+const pending = new Map<string, PendingJob>()
+
+function failPending(error: Error) {
+  for (const job of pending.values()) job.reject(error)
+  pending.clear()
+}
+
+function getSolver(): ChildProcessWithoutNullStreams {
+  if (solver) return solver
+
+  const args = [servicePath]
+  if (process.env.TIMETABLE_CACHE_PATH) args.push("--cache", process.env.TIMETABLE_CACHE_PATH)
+  const child = spawn(pythonBin, args, { stdio: ["pipe", "pipe", "pipe"] })
+
+  readline.createInterface({ input: child.stdout }).on("line", (line) => {
+    let message: any
+    try {
+      message = JSON.parse(line)
+    } catch {
+      return
+    }
+    const job = pending.get(message.id)
+    if (!job) return
+
+    if (message.event === "progress") {
+      job.onProgress?.({
+        placed: message.placed,
+        total: message.total,
+        nodes: message.nodes,
+        best_score: message.best_score,
+      })
+    } else if (message.event === "entries") {
+      job.onEntries?.(message.entries)
+    } else if (message.event === "result") {
+      pending.delete(message.id)
+      job.resolve(message.result)
+    } else if (message.event === "error") {
+      pending.delete(message.id)
+      job.reject(new Error(message.error))
+    }
+  })
+
+  child.stderr.on("data", (data) => console.error("Timetable solver:", data.toString()))
+  child.on("exit", (code) => {
+    solver = null
+    failPending(new Error(`Timetable solver exited with code ${code}`))
+  })
+  child.on("error", (error) => {
+    solver = null
+    failPending(error)
+  })
+
+  solver = child
+  return child
+}
+
+export async function runSolverJob(
+  job: SolverJob,
+  onProgress?: (progress: SolverProgress) => void,
+  onEntries?: (entries: SolverScheduleEntry[]) => void,
+): Promise<TimetableGenerationResult> {
+  const id = `job-${++nextJobId}`
+  // The records go through a file the service parses record by record, instead
+  // of one stdin line it would have to decode whole
+  const { options, ...records } = job
+  const inputPath = path.join(os.tmpdir(), `timetable-${process.pid}-${id}.json`)
+  await fs.writeFile(inputPath, JSON.stringify(records))
+  try {
+    return await new Promise<TimetableGenerationResult>((resolve, reject) => {
+      pending.set(id, { resolve, reject, onProgress, onEntries })
+      getSolver().stdin.write(JSON.stringify({ id, type: "generate", input_path: inputPath, options }) + "\n")
+    })
+  } finally {
+    await fs.rm(inputPath, { force: true })
+  }
+}
@@ -0,0 +1,473 @@
+"""
+Tests for the timetable generators and their supporting modules
+Run from the scripts directory with ``python -m pytest``
+"""
+
+import asyncio
+import io
+import json
+import sqlite3
+import time
+from dataclasses import asdict, replace
+
+import pytest
+
+from timetable_algorithms import (AlgorithmType, BacktrackingTimetableGenerator, CompiledProblem, Course,
+                                  CSPTimetableGenerator, DecomposedTimetableGenerator, Faculty,
+                                  GreedyTimetableGenerator, LocalSearchTimetableGenerator,
+                                  PortfolioTimetableGenerator, Room, StudentCourse, TimeSlot, TimetableChanges,
+                                  TimetableConstraints, TimetableEntry, TimetableGenerator)
+from timetable_audit import TimetableAuditor
+from timetable_benchmark import InstanceSpec, generate_instance
+from timetable_cache import TimetableCache
+from timetable_io import load_job
+from timetable_jobs import JobManager
+from timetable_service import SolverService, _records
+
+def _placements(schedule):
+    return [(c, schedule.assignment[c]) for c in schedule.order]
+
+@pytest.mark.parametrize("seed", range(20))
+def test_batched_greedy_matches_scalar_greedy(seed):
+    constraints = TimetableConstraints()
+    problem = CompiledProblem(*generate_instance(InstanceSpec(courses=60, seed=seed)), constraints)
+    batched = GreedyTimetableGenerator(constraints, batched=True).solve(problem)
+    scalar = GreedyTimetableGenerator(constraints, batched=False).solve(problem)
+    assert _placements(batched) == _placements(scalar)
+    assert list(batched.scores) == pytest.approx(list(scalar.scores))
+
+def test_dsatur_places_at_least_as_many_courses_as_priority_order():
+    constraints = TimetableConstraints()
+    totals = {"priority": 0, "dsatur": 0}
+    for seed in range(8):
+        instance = generate_instance(InstanceSpec(courses=200, tightness=0.95, seed=seed))
+        problem = CompiledProblem(*instance, constraints)
+        for ordering in totals:
+            schedule = GreedyTimetableGenerator(constraints, ordering=ordering).solve(problem)
+            totals[ordering] += len(schedule)
+            if ordering == "dsatur":
+                assert TimetableAuditor(*instance).audit(schedule.entries)["valid"]
+    # Single instances can go either way; over several tight ones DSatur must not lose
+    assert totals["dsatur"] >= totals["priority"]
+
+@pytest.mark.parametrize("seed", range(15))
+def test_backjumping_finds_the_chronological_first_solution(seed):
+    constraints = TimetableConstraints()
+    spec = InstanceSpec(courses=10, periods_per_day=2, rooms=2, faculty=4, seed=seed)
+    problem = CompiledProblem(*generate_instance(spec), constraints)
+    jumping = BacktrackingTimetableGenerator(constraints, backjumping=True, max_nodes=50000)
+    chronological = BacktrackingTimetableGenerator(constraints, backjumping=False, max_nodes=50000)
+    jumped = jumping.solve(problem)
+    walked = chronological.solve(problem)
+    if chronological.stats.interrupted:
+        pytest.skip("chronological search hit the node cap")
+    assert not jumping.stats.interrupted
+    assert list(jumped.assignment) == list(walked.assignment)
+    assert jumping.stats.nodes <= chronological.stats.nodes
+
+@pytest.fixture
+def job_text():
+    courses, faculty, rooms, time_slots = generate_instance(InstanceSpec(courses=40, seed=3))
+    enrollments = [StudentCourse(f"s{i}", courses[(i * 7 + k) % 40].id) for i in range(30) for k in range(3)]
+    data = {
+        "algorithm": "greedy",
+        "courses": [asdict(c) for c in courses],
+        "faculty": [asdict(f) for f in faculty],
+        "rooms": [asdict(r) for r in rooms],
+        "time_slots": [asdict(t) for t in time_slots],
+        "student_courses": [asdict(e) for e in enrollments],
+        "unused": {"nested": [1, 2.5, "x"]},
+        "options": {"decompose": True},
+    }
+    return json.dumps(data, indent=1)
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 17, 1 << 16])
+def test_load_job_matches_json_load(job_text, chunk_size):
+    data = json.loads(job_text)
+    job = load_job(io.StringIO(job_text), chunk_size)
+    assert job.algorithm == "greedy"
+    assert job.options == {"decompose": True}
+    assert job.courses == _records(Course, data["courses"])
+    assert job.faculty == _records(Faculty, data["faculty"])
+    assert job.rooms == _records(Room, data["rooms"])
+    assert job.time_slots == _records(TimeSlot, data["time_slots"])
+    assert job.student_courses == _records(StudentCourse, data["student_courses"])
+
+@pytest.mark.parametrize("text", [
+    '{"courses": [1]}',
+    '{"courses": [{"id": "c0"}]}',
+    '{"time_slots": [{"id": "t", "day_of_week": 1, "start_time": "", "end_time": "", "slot_name": ""},'
+    ' {"id": "t", "day_of_week": 1, "start_time": "", "end_time": "", "slot_name": ""}]}',
+    '{"courses": [',
+    '[]',
+])
+def test_load_job_rejects_malformed_input(text):
+    with pytest.raises(ValueError):
+        load_job(io.StringIO(text), 4)
+
+def test_audit_counts_injected_violations():
+    courses, faculty, rooms, time_slots = generate_instance(InstanceSpec(courses=30, seed=1))
+    first, second = courses[0], replace(courses[1], faculty_id=courses[0].faculty_id)
+    courses[1] = second
+    enrollments = [StudentCourse("s0", first.id), StudentCourse("s0", second.id)]
+    availability = next(f.availability for f in faculty if f.id == first.faculty_id)
+    available = next(t.id for t in time_slots if t.id in availability)
+    unavailable = [t.id for t in time_slots if t.id not in availability]
+    room = next(r for r in rooms if r.room_type == first.required_room_type and r.capacity >= first.min_capacity)
+    
+    entries = [
+        # Same room, faculty member and student group in one slot
+        {"course_id": first.id, "faculty_id": first.faculty_id, "room_id": room.id, "time_slot_id": available},
+        {"course_id": second.id, "faculty_id": second.faculty_id, "room_id": room.id, "time_slot_id": available},
+        {"course_id": courses[2].id, "faculty_id": courses[2].faculty_id, "room_id": "missing",
+         "time_slot_id": available},
+    ]
+    if unavailable:
+        entries.append({"course_id": first.id, "faculty_id": first.faculty_id, "room_id": room.id,
+                        "time_slot_id": unavailable[0]})
+    
+    report = TimetableAuditor(courses, faculty, rooms, time_slots, enrollments).audit(entries)
+    counts = report["violation_counts"]
+    assert not report["valid"]
+    assert counts["room_double_booking"] == 1
+    assert counts["faculty_double_booking"] == 1
+    assert counts["student_clash"] == 1
+    assert counts["unknown_reference"] == 1
+    assert counts["availability"] == (1 if unavailable else 0)
+    assert report["violations"]["room_double_booking"][0]["course_ids"] == [first.id, second.id]
+
+def test_audit_accepts_generated_schedule():
+    instance = generate_instance(InstanceSpec(courses=80, seed=4))
+    constraints = TimetableConstraints()
+    problem = CompiledProblem(*instance, constraints)
+    schedule = GreedyTimetableGenerator(constraints).solve(problem)
+    report = TimetableAuditor(*instance).audit(schedule.entries)
+    assert report["valid"]
+    assert report["entries"] == len(schedule)
+
+@pytest.mark.parametrize("algorithm", [AlgorithmType.GREEDY, AlgorithmType.BACKTRACKING,
+                                       AlgorithmType.CONSTRAINT_SATISFACTION, AlgorithmType.LOCAL_SEARCH])
+def test_generators_keep_courses_sharing_students_apart(algorithm):
+    instance = generate_instance(InstanceSpec(courses=60, seed=6))
+    courses = instance[0]
+    enrollments = [StudentCourse(f"s{i}", courses[(i * 7 + k) % 60].id) for i in range(40) for k in range(4)]
+    auditor = TimetableAuditor(*instance, enrollments)
+    generator = TimetableGenerator()
+    # Without the enrollments the same instance does produce clashes
+    unaware = generator.generate_timetable(algorithm, *instance)
+    assert auditor.audit(unaware["schedule"])["violation_counts"]["student_clash"] > 0
+    
+    result = generator.generate_timetable(algorithm, *instance, student_courses=enrollments)
+    report = auditor.audit(result["schedule"])
+    assert result["scheduled_courses"] > 0
+    assert report["valid"], report["violation_counts"]
+
+def test_parallel_scenarios_match_sequential_scenarios():
+    instance = generate_instance(InstanceSpec(courses=120, tightness=0.9, seed=8))
+    rooms, time_slots = instance[2], instance[3]
+    scenarios = {
+        "fewer-rooms": TimetableChanges(removed_rooms=[r.id for r in rooms[:3]]),
+        "no-first-slot": TimetableChanges(removed_time_slots=[time_slots[0].id]),
+    }
+    generator = TimetableGenerator()
+    sequential = generator.compare_scenarios(AlgorithmType.GREEDY, *instance, scenarios)
+    parallel = generator.compare_scenarios(AlgorithmType.GREEDY, *instance, scenarios, max_workers=2)
+    
+    assert list(parallel["scenarios"]) == ["base", "fewer-rooms", "no-first-slot"]
+    for name, result in sequential["scenarios"].items():
+        assert parallel["scenarios"][name]["schedule"] == result["schedule"]
+        # Each scenario is solved as if its changes had been applied to the inputs directly
+        changes = scenarios.get(name, TimetableChanges())
+        direct = generator.generate_timetable(AlgorithmType.GREEDY, *changes.apply(*instance))
+        assert result["schedule"] == direct["schedule"]
+    assert parallel["comparison"] == sequential["comparison"]
+    
+    base = sequential["scenarios"]["base"]
+    for row in sequential["comparison"]:
+        result = sequential["scenarios"][row["scenario"]]
+        assert row["success_rate_delta"] == pytest.approx(result["success_rate"] - base["success_rate"])
+        assert row["score_delta"] == pytest.approx(result["metrics"]["overall_score"] -
+                                                   base["metrics"]["overall_score"])
+    assert sequential["comparison"][0]["success_rate_delta"] == 0
+    assert sequential["comparison"][1]["success_rate_delta"] < 0
+
+def _entries(result):
+    return [TimetableEntry(e["course_id"], e["faculty_id"], e["room_id"], e["time_slot_id"], e["conflict_score"])
+            for e in result["schedule"]]
+
+@pytest.mark.parametrize("algorithm", [AlgorithmType.CONSTRAINT_SATISFACTION, AlgorithmType.GREEDY])
+@pytest.mark.parametrize("seed", [0, 3])
+def test_noop_repair_keeps_every_entry(algorithm, seed):
+    instance = generate_instance(InstanceSpec(courses=300, tightness=0.9, seed=seed))
+    generator = TimetableGenerator()
+    existing = _entries(generator.generate_timetable(AlgorithmType.GREEDY, *instance))
+    repaired = generator.repair_timetable(existing, TimetableChanges(), *instance, algorithm=algorithm)
+    assert repaired["scheduled_courses"] == len(existing)
+    assert repaired["moved_entries"] == 0
+
+@pytest.mark.parametrize("algorithm", [AlgorithmType.CONSTRAINT_SATISFACTION, AlgorithmType.GREEDY])
+def test_infeasible_repair_is_bounded_and_keeps_pinned_entries(algorithm):
+    instance = generate_instance(InstanceSpec(courses=300, tightness=0.9, seed=1))
+    courses, faculty, rooms, time_slots = instance
+    generator = TimetableGenerator()
+    existing = _entries(generator.generate_timetable(AlgorithmType.GREEDY, *instance))
+    # No room fits the edited course, and the removed room's courses must move
+    unplaceable = replace(courses[0], min_capacity=10 ** 6)
+    removed = rooms[-1].id
+    changes = TimetableChanges(courses=[unplaceable], removed_rooms=[removed])
+    pinned = sum(1 for e in existing if e.room_id != removed and e.course_id != unplaceable.id)
+    
+    start = time.monotonic()
+    repaired = generator.repair_timetable(existing, changes, *instance, algorithm=algorithm, time_limit=0.5)
+    assert time.monotonic() - start < 5
+    assert repaired["success"]
+    assert repaired["scheduled_courses"] >= pinned
+    assert unplaceable.id not in {e["course_id"] for e in repaired["schedule"]}
+
+@pytest.mark.parametrize("algorithm", [AlgorithmType.LOCAL_SEARCH, AlgorithmType.PORTFOLIO])
+@pytest.mark.parametrize("seed", [0, 1])
+def test_repair_moves_never_land_on_pinned_entries(algorithm, seed):
+    instance = generate_instance(InstanceSpec(courses=150, tightness=0.9, seed=seed))
+    rooms = instance[2]
+    generator = TimetableGenerator()
+    existing = _entries(generator.generate_timetable(AlgorithmType.GREEDY, *instance))
+    changes = TimetableChanges(removed_rooms=[rooms[0].id])
+    repaired = generator.repair_timetable(existing, changes, *instance, algorithm=algorithm)
+    remaining = changes.apply(*instance)
+    report = TimetableAuditor(*remaining).audit(repaired["schedule"])
+    assert repaired["success"]
+    assert report["valid"], report["violation_counts"]
+
+def test_cache_warm_starts_only_from_complete_schedules(tmp_path):
+    courses, faculty, rooms, time_slots = generate_instance(InstanceSpec(courses=60, seed=2))
+    edited = replace(courses[5], credits=courses[5].credits % 4 + 1)
+    generator = TimetableGenerator(cache=TimetableCache(str(tmp_path / "cache.sqlite3")))
+    
+    first = generator.generate_timetable(AlgorithmType.GREEDY, courses, faculty, rooms, time_slots)
+    assert first["scheduled_courses"] == len(courses)
+    warm = generator.generate_timetable(AlgorithmType.GREEDY, [edited] + courses[1:5] + courses[6:] + [courses[0]],
+                                        faculty, rooms, time_slots)
+    assert warm["cache"] == "warm"
+    
+    # A course no room fits leaves the cached schedule of a fresh cache incomplete
+    cache = TimetableCache(str(tmp_path / "incomplete.sqlite3"))
+    generator = TimetableGenerator(cache=cache)
+    incomplete = [replace(courses[0], min_capacity=10 ** 6)] + courses[1:]
+    assert generator.generate_timetable(AlgorithmType.GREEDY, incomplete, faculty, rooms, 
+                                        time_slots)["cache"] == "miss"
+    again = generator.generate_timetable(AlgorithmType.GREEDY, incomplete[:-1], faculty, rooms, time_slots)
+    assert again["cache"] == "miss"
+    assert cache.stats.warm_starts == 0
+
+def test_streamed_schedule_matches_inline_schedule():
+    instance = generate_instance(InstanceSpec(courses=120, seed=5))
+    generator = TimetableGenerator()
+    inline = generator.generate_timetable(AlgorithmType.GREEDY, *instance)
+    chunks = []
+    streamed = generator.generate_timetable(AlgorithmType.GREEDY, *instance, on_entries=chunks.append,
+                                            entries_chunk_size=50)
+    assert streamed["schedule"] == []
+    assert all(len(chunk) <= 50 for chunk in chunks)
+    assert [row for chunk in chunks for row in chunk] == inline["schedule"]
+    assert streamed["scheduled_courses"] == inline["scheduled_courses"]
+
+def test_service_streams_entries_for_a_job_file(tmp_path, job_text):
+    path = tmp_path / "job.json"
+    path.write_text(job_text)
+    output = io.StringIO()
+    request = {"id": "j", "input_path": str(path), "options": {"schedule_chunk_size": 7}}
+    SolverService(output=output).serve([json.dumps(request)])
+    events = [json.loads(line) for line in output.getvalue().splitlines()]
+    result = events[-1]
+    assert result["event"] == "result"
+    entries = [row for event in events if event["event"] == "entries" for row in event["entries"]]
+    assert result["result"]["schedule"] == []
+    assert len(entries) == result["result"]["scheduled_courses"] > 0
+
+def test_service_reports_cache_failures_and_keeps_serving(tmp_path, job_text, monkeypatch):
+    cache = TimetableCache(str(tmp_path / "cache.sqlite3"))
+    
+    def locked(key):
+        raise sqlite3.OperationalError("database is locked")
+    
+    monkeypatch.setattr(cache, "get", locked)
+    output = io.StringIO()
+    requests = [json.dumps({"id": "j", **json.loads(job_text)}), json.dumps({"id": "p", "type": "ping"})]
+    SolverService(output=output, cache=cache).serve(requests)
+    events = [(event["id"], event["event"]) for event in map(json.loads, output.getvalue().splitlines())]
+    assert events == [("j", "accepted"), ("j", "error"), ("p", "pong")]
+    assert "database is locked" in output.getvalue()
+
+@pytest.mark.parametrize("algorithm", [AlgorithmType.GREEDY, AlgorithmType.BACKTRACKING,
+                                       AlgorithmType.CONSTRAINT_SATISFACTION, AlgorithmType.LOCAL_SEARCH])
+def test_entry_scores_add_up_to_overall_score(algorithm):
+    generator = TimetableGenerator()
+    generator.generators[AlgorithmType.LOCAL_SEARCH].time_budget = 0.2
+    result = generator.generate_timetable(algorithm, *generate_instance(InstanceSpec(courses=40, seed=6)))
+    scores = [entry["conflict_score"] for entry in result["schedule"]]
+    assert result["scheduled_courses"] > 0
+    assert all(score > 0 for score in scores)
+    assert sum(scores) / len(scores) == pytest.approx(result["metrics"]["overall_score"])
+
+def test_local_search_with_max_iterations_is_reproducible():
+    constraints = TimetableConstraints()
+    problem = CompiledProblem(*generate_instance(InstanceSpec(courses=80, tightness=0.9, seed=7)), constraints)
+    runs = []
+    # The second run is slowed down, which shifted a wall-clock cooling schedule and
+    # with it which moves were accepted (visible in the constraint check count)
+    for pause in (0.0, 0.05):
+        generator = LocalSearchTimetableGenerator(constraints, time_budget=2.0, seed=4, max_iterations=3000,
+                                                  initial_temperature=1.0)
+        generator.on_progress = lambda progress: time.sleep(pause)
+        schedule = generator.solve(problem)
+        runs.append((_placements(schedule), list(schedule.scores), generator.stats.constraint_checks))
+    assert runs[0] == runs[1]
+
+def _independent_groups(group_sizes, n_slots=6):
+    """One faculty member and room type per group, so each group is its own component.
+    
+    Only the first slot is preferred, which keeps local search busy until its time budget runs out.
+    """
+    time_slots = [TimeSlot(f"t{s}", s % 5 + 1, "09:00", "10:00", f"Slot {s}") for s in range(n_slots)]
+    courses, faculty, rooms = [], [], []
+    for g, size in enumerate(group_sizes):
+        faculty.append(Faculty(f"f{g}", f"Faculty {g}", "d0", 40, [],
+                               {t.id: 5 if t.id == "t0" else 1 for t in time_slots}))
+        rooms.append(Room(f"r{g}", f"R{g}", 50, f"type{g}", []))
+        courses.extend(Course(f"c{g}-{i}", f"C{g}{i}", f"Course {g}-{i}", 3, 1, "theory", f"f{g}", f"type{g}", 30)
+                       for i in range(size))
+    return courses, faculty, rooms, time_slots
+
+def test_decomposed_local_search_shares_its_time_budget():
+    constraints = TimetableConstraints()
+    problem = CompiledProblem(*_independent_groups([2, 4, 6, 4]), constraints)
+    assert len(problem.components()) == 4
+    budgets = []
+    
+    class RecordingLocalSearch(LocalSearchTimetableGenerator):
+        def solve(self, problem):
+            budgets.append((problem.n_courses, self.time_budget))
+            return super().solve(problem)
+    
+    local_search = RecordingLocalSearch(constraints, time_budget=0.4, seed=1)
+    schedule = DecomposedTimetableGenerator(local_search).solve(problem)
+    assert len(schedule) == problem.n_courses
+    assert [size for size, _ in budgets] == [6, 4, 4, 2]
+    # The shares add up to the one budget, sized by component and never beyond what was left
+    assert sum(budget for _, budget in budgets) <= 0.4
+    assert budgets[0][1] <= 0.4 * 6 / 16
+    assert local_search.time_budget == 0.4
+
+def test_failed_run_has_the_same_keys_as_a_successful_one(monkeypatch):
+    instance = generate_instance(InstanceSpec(courses=20, seed=2))
+    timetable_generator = TimetableGenerator()
+    succeeded = timetable_generator.generate_timetable(AlgorithmType.GREEDY, *instance)
+    
+    def fail(problem):
+        raise RuntimeError("solver crashed")
+    
+    monkeypatch.setattr(timetable_generator.generators[AlgorithmType.GREEDY], "solve", fail)
+    failed = timetable_generator.generate_timetable(AlgorithmType.GREEDY, *instance)
+    assert not failed["success"]
+    assert failed["error"] == "solver crashed"
+    assert set(failed) == set(succeeded) | {"error"}
+    assert set(failed["stats"]) == set(succeeded["stats"])
+
+def _pigeonhole(solvable=3):
+    """A solvable group plus one faculty member with a course more than slots; CSP cannot
+    prove the second group infeasible in reasonable time, so it runs until stopped"""
+    return _independent_groups([solvable, 13], n_slots=12)
+
+def test_decomposed_workers_stop_when_asked():
+    constraints = TimetableConstraints()
+    problem = CompiledProblem(*_pigeonhole(), constraints)
+    generator = DecomposedTimetableGenerator(CSPTimetableGenerator(constraints), max_workers=2)
+    started = time.monotonic()
+    generator.should_stop = lambda: time.monotonic() - started > 0.5
+    schedule = generator.solve(problem)
+    assert time.monotonic() - started < 30
+    assert generator.stats.interrupted
+    assert len(schedule) == 3
+
+def test_job_deadline_stops_a_decomposed_solve():
+    async def scenario():
+        manager = JobManager(max_workers=1)
+        try:
+            result = await manager.run("inst", AlgorithmType.CONSTRAINT_SATISFACTION, *_pigeonhole(),
+                                       deadline=0.5, decompose=True, max_workers=2)
+        finally:
+            manager.shutdown()
+        return result, manager.jobs["job-1"]
+    
+    started = time.monotonic()
+    result, job = asyncio.run(scenario())
+    assert time.monotonic() - started < 30
+    assert job.status == "done"
+    assert result["stats"]["interrupted"]
+    assert result["scheduled_courses"] == 3
+
+def test_job_manager_limits_running_jobs_per_institution():
+    async def scenario():
+        manager = JobManager(max_workers=4, max_per_institution=1)
+        try:
+            jobs = [manager.submit(institution, AlgorithmType.CONSTRAINT_SATISFACTION, *_pigeonhole(), 
+                                   deadline=0.5) 
+                    for institution in ("a", "a", "b")]
+            await asyncio.sleep(0.2)
+            statuses = [job.status for job in jobs]
+            await asyncio.gather(*(job.result() for job in jobs))
+        finally:
+            manager.shutdown()
+        return statuses, [job.status for job in jobs]
+    
+    while_running, finished = asyncio.run(scenario())
+    assert while_running == ["running", "queued", "running"]
+    assert finished == ["done"] * 3
+
+def test_cancelling_a_queued_job_never_runs_it():
+    async def scenario():
+        manager = JobManager(max_workers=2, max_per_institution=1)
+        try:
+            running = manager.submit("a", AlgorithmType.CONSTRAINT_SATISFACTION, *_pigeonhole())
+            queued = manager.submit("a", AlgorithmType.CONSTRAINT_SATISFACTION, *_pigeonhole())
+            await asyncio.sleep(0.2)
+            assert manager.cancel(queued.id)
+            with pytest.raises(asyncio.CancelledError):
+                await queued.result()
+            assert running.status == "running"
+            assert manager.cancel(running.id)
+            result = await running.result()
+        finally:
+            manager.shutdown()
+        return running, queued, result
+    
+    running, queued, result = asyncio.run(scenario())
+    assert queued.status == "cancelled"
+    assert queued.progress is None
+    assert running.status == "cancelled"
+    assert result["stats"]["interrupted"]
+
+def test_portfolio_returns_the_first_complete_schedule():
+    instance = generate_instance(InstanceSpec(courses=120, seed=5))
+    constraints = TimetableConstraints()
+    problem = CompiledProblem(*instance, constraints)
+    portfolio = PortfolioTimetableGenerator(constraints, max_workers=2, deadline=60.0)
+    started = time.monotonic()
+    schedule = portfolio.solve(problem)
+    # Local search strategies would use the whole 60 s deadline if the portfolio waited for them
+    assert time.monotonic() - started < 20
+    assert len(schedule) == problem.n_courses
+    assert portfolio.stats.strategy is not None
+    assert TimetableAuditor(*instance).audit(schedule.entries)["valid"]
+
+def test_portfolio_deadline_bounds_its_run_time():
+    constraints = TimetableConstraints()
+    problem = CompiledProblem(*_pigeonhole(), constraints)
+    strategies = [("greedy", "greedy", {}), ("csp", "constraint_satisfaction", {})]
+    portfolio = PortfolioTimetableGenerator(constraints, strategies, max_workers=2, deadline=1.0)
+    started = time.monotonic()
+    schedule = portfolio.solve(problem)
+    assert time.monotonic() - started < 10
+    assert portfolio.stats.interrupted
+    assert portfolio.stats.strategy == "greedy"
+    assert len(schedule) == 3 + 12
@@ -1,19 +1,32 @@
 """
 AI-Based Timetable Generation Algorithms
-Implements Greedy, Backtracking, and Constraint Satisfaction algorithms
+Implements Greedy, Backtracking, Constraint Satisfaction and Local Search algorithms
 """
 
+import copy
 import json
+import math
+import multiprocessing
+import os
 import random
-from typing import List, Dict, Set, Tuple, Optional
-from dataclasses import dataclass
+import time
+from array import array
+from typing import Callable, Iterable, Iterator, List, Dict, Sequence, Set, Tuple, Optional
+from dataclasses import dataclass, asdict, field
 from enum import Enum
+import heapq
 import itertools
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 
 class AlgorithmType(Enum):
     GREEDY = "greedy"
     BACKTRACKING = "backtracking"
     CONSTRAINT_SATISFACTION = "constraint_satisfaction"
+    LOCAL_SEARCH = "local_search"
+    PORTFOLIO = "portfolio"
 
 @dataclass
 class TimeSlot:
@@ -53,6 +66,11 @@ class Course:
     min_capacity: int
 
 @dataclass
+class StudentCourse:
+    student_id: str
+    course_id: str
+
+@dataclass(slots=True)
 class TimetableEntry:
     course_id: str
     faculty_id: str
@@ -60,10 +78,152 @@ class TimetableEntry:
     time_slot_id: str
     conflict_score: float = 0.0
 
+@dataclass
+class TimetableChanges:
+    """Edits to the inputs of an existing timetable.
+    
+    Records replace the ones with the same id (or are added); ``removed_*`` hold
+    the ids of records that no longer exist.
+    """
+    courses: List[Course] = field(default_factory=list)
+    faculty: List[Faculty] = field(default_factory=list)
+    rooms: List[Room] = field(default_factory=list)
+    time_slots: List[TimeSlot] = field(default_factory=list)
+    removed_courses: List[str] = field(default_factory=list)
+    removed_faculty: List[str] = field(default_factory=list)
+    removed_rooms: List[str] = field(default_factory=list)
+    removed_time_slots: List[str] = field(default_factory=list)
+    
+    def apply(self, courses: List[Course], faculty: List[Faculty], rooms: List[Room], 
+              time_slots: List[TimeSlot]) -> Tuple[List[Course], List[Faculty], List[Room], List[TimeSlot]]:
+        """Return the edited copies of the input lists"""
+        return (_apply_edits(courses, self.courses, self.removed_courses),
+                _apply_edits(faculty, self.faculty, self.removed_faculty),
+                _apply_edits(rooms, self.rooms, self.removed_rooms),
+                _apply_edits(time_slots, self.time_slots, self.removed_time_slots))
+
+def _apply_edits(records: List, updates: List, removed: List[str]) -> List:
+    """Replace records by id, append new ones and drop removed ids, keeping input order"""
+    updated = {r.id: r for r in updates}
+    dropped = set(removed)
+    result = [updated.pop(r.id, r) for r in records if r.id not in dropped]
+    result.extend(r for r in updated.values() if r.id not in dropped)
+    return result
+
+class SearchInterrupted(Exception):
+    """Raised inside a search when its should_stop callback fires"""
+
+def _raise_if_stopped(should_stop: Optional[Callable[[], bool]]):
+    """Cooperative cancellation point for long-running searches"""
+    if should_stop is not None and should_stop():
+        raise SearchInterrupted()
+
+def _report_progress(on_progress: Optional[Callable[[Dict], None]], placed: int, total: int, 
+                     nodes: int, best_score: Optional[float] = None):
+    """Send a progress event to an optional callback"""
+    if on_progress is not None:
+        on_progress({"placed": placed, "total": total, "nodes": nodes, "best_score": best_score})
+
+@dataclass
+class SearchStats:
+    nodes: int = 0  # placements attempted
+    backtracks: int = 0
+    peak_trail_size: int = 0  # most domain reductions recorded at once
+    peak_memory_bytes: Optional[int] = None  # only measured when requested
+    backjumps: int = 0
+    restarts: int = 0
+    constraint_checks: int = 0  # bitset hard-constraint evaluations (free values, revisions, point checks)
+    wipeouts: int = 0  # domains or free-value sets found empty
+    cache_hits: int = 0  # memoized soft-constraint terms or whole cached solves reused
+    phases: Dict[str, float] = field(default_factory=dict)  # seconds per phase
+    interrupted: bool = False  # stopped through should_stop or a node cap before finishing
+    strategy: Optional[str] = None  # portfolio strategy that produced the result
+    
+    @contextmanager
+    def phase(self, name: str):
+        """Add the time spent in the block to ``phases[name]``"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - start
+    
+    def merge(self, other: "SearchStats"):
+        """Accumulate the counters and phase times of another run"""
+        self.nodes += other.nodes
+        self.backtracks += other.backtracks
+        self.backjumps += other.backjumps
+        self.restarts += other.restarts
+        self.constraint_checks += other.constraint_checks
+        self.wipeouts += other.wipeouts
+        self.cache_hits += other.cache_hits
+        self.peak_trail_size = max(self.peak_trail_size, other.peak_trail_size)
+        for name, seconds in other.phases.items():
+            self.phases[name] = self.phases.get(name, 0.0) + seconds
+        self.interrupted = self.interrupted or other.interrupted
+    
+    def as_dict(self) -> Dict:
+        return asdict(self)
+
+class OccupancyIndex:
+    """Incrementally maintained faculty/room occupancy for constant-time conflict checks"""
+    
+    def __init__(self, entries: Optional[List[TimetableEntry]] = None):
+        self.entries: List[TimetableEntry] = []
+        self.faculty_slots: Set[Tuple[str, str]] = set()
+        self.room_slots: Set[Tuple[str, str]] = set()
+        self.faculty_hours: Dict[str, int] = {}
+        for entry in entries or []:
+            self.assign(entry)
+    
+    def assign(self, entry: TimetableEntry):
+        """Record an entry as part of the schedule"""
+        self.entries.append(entry)
+        self.faculty_slots.add((entry.faculty_id, entry.time_slot_id))
+        self.room_slots.add((entry.room_id, entry.time_slot_id))
+        self.faculty_hours[entry.faculty_id] = self.faculty_hours.get(entry.faculty_id, 0) + 1
+    
+    def unassign(self, entry: TimetableEntry):
+        """Remove a previously assigned entry (most recent assignments are cheapest)"""
+        if self.entries and self.entries[-1] is entry:
+            self.entries.pop()
+        else:
+            self.entries.remove(entry)
+        self.faculty_slots.discard((entry.faculty_id, entry.time_slot_id))
+        self.room_slots.discard((entry.room_id, entry.time_slot_id))
+        self.faculty_hours[entry.faculty_id] -= 1
+    
+    def faculty_busy(self, faculty_id: str, time_slot_id: str) -> bool:
+        return (faculty_id, time_slot_id) in self.faculty_slots
+    
+    def room_busy(self, room_id: str, time_slot_id: str) -> bool:
+        return (room_id, time_slot_id) in self.room_slots
+    
+    def hours(self, faculty_id: str) -> int:
+        return self.faculty_hours.get(faculty_id, 0)
+    
+    def students_busy(self, course_id: str, time_slot_id: str) -> bool:
+        # Entries carry no enrollments, so only BitsetOccupancy can answer this, from its problem
+        raise NotImplementedError("Student clashes need enrollment data; check against a BitsetOccupancy")
+    
+    def __iter__(self):
+        return iter(self.entries)
+    
+    def __len__(self) -> int:
+        return len(self.entries)
+
+def _as_index(schedule) -> OccupancyIndex:
+    """Accept either a plain schedule list or an OccupancyIndex"""
+    if isinstance(schedule, OccupancyIndex):
+        return schedule
+    return OccupancyIndex(schedule)
+
 class TimetableConstraints:
     """Defines all constraints for timetable generation"""
     
     def __init__(self):
+        # Checks that work on any schedule; no_student_clash needs a BitsetOccupancy
+        # and is enforced by the generators through the compiled student graph
         self.hard_constraints = [
             self.no_faculty_conflict,
             self.no_room_conflict,
@@ -79,21 +239,17 @@ class TimetableConstraints:
             self.department_clustering
         ]
     
-    def no_faculty_conflict(self, entry: TimetableEntry, schedule: List[TimetableEntry]) -> bool:
+    def no_faculty_conflict(self, entry: TimetableEntry, schedule: OccupancyIndex) -> bool:
         """Faculty cannot be in two places at the same time"""
-        for existing in schedule:
-            if (existing.faculty_id == entry.faculty_id and 
-                existing.time_slot_id == entry.time_slot_id):
-                return False
-        return True
+        return not _as_index(schedule).faculty_busy(entry.faculty_id, entry.time_slot_id)
     
-    def no_room_conflict(self, entry: TimetableEntry, schedule: List[TimetableEntry]) -> bool:
+    def no_room_conflict(self, entry: TimetableEntry, schedule: OccupancyIndex) -> bool:
         """Room cannot be double-booked"""
-        for existing in schedule:
-            if (existing.room_id == entry.room_id and 
-                existing.time_slot_id == entry.time_slot_id):
-                return False
-        return True
+        return not _as_index(schedule).room_busy(entry.room_id, entry.time_slot_id)
+    
+    def no_student_clash(self, entry: TimetableEntry, schedule: OccupancyIndex) -> bool:
+        """Courses sharing students cannot be in the same time slot; needs a BitsetOccupancy"""
+        return not _as_index(schedule).students_busy(entry.course_id, entry.time_slot_id)
     
     def faculty_availability(self, entry: TimetableEntry, faculty_data: Dict[str, Faculty]) -> bool:
         """Faculty must be available at the assigned time"""
@@ -128,99 +284,884 @@ class TimetableConstraints:
         preference = faculty.availability.get(entry.time_slot_id, 1)
         return preference / 5.0  # Normalize to 0-1
     
-    def balanced_workload(self, entry: TimetableEntry, schedule: List[TimetableEntry], 
+    def balanced_workload(self, entry: TimetableEntry, schedule: OccupancyIndex, 
                          faculty_data: Dict[str, Faculty]) -> float:
         """Penalize overloaded faculty"""
         faculty = faculty_data.get(entry.faculty_id)
         if not faculty:
             return 0.0
         
-        current_hours = sum(1 for s in schedule if s.faculty_id == entry.faculty_id)
+        current_hours = _as_index(schedule).hours(entry.faculty_id)
         max_hours = faculty.max_hours_per_week
         
         if current_hours >= max_hours:
             return 0.0
         return 1.0 - (current_hours / max_hours)
     
-    def minimize_gaps(self, entry: TimetableEntry, schedule: List[TimetableEntry]) -> float:
+    def minimize_gaps(self, entry: TimetableEntry, schedule: OccupancyIndex) -> float:
         """Prefer consecutive time slots for same faculty"""
-        faculty_slots = [s.time_slot_id for s in schedule if s.faculty_id == entry.faculty_id]
         # This is a simplified version - in practice, you'd check actual time adjacency
-        return 0.8 if len(faculty_slots) > 0 else 1.0
+        return 0.8 if _as_index(schedule).hours(entry.faculty_id) > 0 else 1.0
     
     def department_clustering(self, entry: TimetableEntry, course_data: Dict[str, Course]) -> float:
         """Prefer grouping courses from same department"""
         # Simplified implementation
         return 0.9
 
+def _bitset(positions, size: int) -> int:
+    """Int with the given bit positions set, built in a byte buffer instead of one OR per bit"""
+    buffer = bytearray((size + 7) // 8)
+    for p in positions:
+        buffer[p >> 3] |= 1 << (p & 7)
+    return int.from_bytes(buffer, "little")
+
+def _iter_bits(mask: int):
+    """Yield the positions of set bits in ascending order"""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+class CompiledProblem:
+    """Dense integer encoding of a timetabling instance.
+    
+    Courses, rooms, time slots and faculty are mapped to contiguous indices and
+    every (room, slot) pair becomes a single value ``room_idx * n_slots + slot_idx``.
+    The unary constraints are precomputed once as one bitset per course over that
+    value space, so generators never build entries for infeasible combinations.
+    Students are indexed too, so each course's enrollment is a bitset over students.
+    
+    ``base`` is a problem compiled from similar inputs with the same constraints;
+    per-faculty slot bitsets and preferences, room bitsets and the enrollment
+    graph are taken from it wherever the records they depend on are unchanged.
+    """
+    
+    def __init__(self, courses: List[Course], faculty: List[Faculty], 
+                 rooms: List[Room], time_slots: List[TimeSlot],
+                 constraints: Optional[TimetableConstraints] = None,
+                 student_courses: Optional[List[StudentCourse]] = None,
+                 base: Optional["CompiledProblem"] = None):
+        self.courses = list(courses)
+        self.faculty = list(faculty)
+        self.rooms = list(rooms)
+        self.time_slots = list(time_slots)
+        self.student_courses = list(student_courses or [])
+        self.constraints = constraints or TimetableConstraints()
+        if base is not None and base.constraints is not self.constraints:
+            base = None  # compiled against other constraint functions
+        
+        self.faculty_data = {f.id: f for f in self.faculty}
+        self.room_data = {r.id: r for r in self.rooms}
+        self.course_data = {c.id: c for c in self.courses}
+        
+        self.course_index = {c.id: i for i, c in enumerate(self.courses)}
+        self.faculty_index = {f.id: i for i, f in enumerate(self.faculty)}
+        self.room_index = {r.id: i for i, r in enumerate(self.rooms)}
+        self.slot_index = {t.id: i for i, t in enumerate(self.time_slots)}
+        
+        self.n_courses = len(self.courses)
+        self.n_rooms = len(self.rooms)
+        self.n_slots = len(self.time_slots)
+        self.n_values = self.n_rooms * self.n_slots
+        
+        # -1 marks a course whose faculty member is unknown
+        self.course_faculty = [self.faculty_index.get(c.faculty_id, -1) for c in self.courses]
+        
+        # Bit pattern with the lowest slot bit of every room set; multiplying a
+        # slot bitset by it replicates the slots across all rooms
+        self.room_repeat = sum(1 << (r * self.n_slots) for r in range(self.n_rooms))
+        self.all_slots = (1 << self.n_slots) - 1
+        
+        self.unary_masks = self._compile_unary_masks(base)
+        self.slot_preference = self._compile_slot_preferences(base)
+        if (base is not None and base.courses == self.courses and 
+                base.student_courses == self.student_courses):
+            self.n_students = base.n_students
+            self.enrollment = base.enrollment
+            self.student_conflicts = base.student_conflicts
+        else:
+            self._compile_enrollments(self.student_courses)
+        self._compile_neighbors()
+    
+    def _reusable_faculty(self, base: Optional["CompiledProblem"]) -> Dict[str, int]:
+        """Base index of every faculty member whose slot-level data can be taken from ``base``"""
+        if base is None or base.time_slots != self.time_slots:
+            return {}
+        return {f.id: i for i, f in enumerate(base.faculty) if self.faculty_data.get(f.id) == f}
+    
+    def _compile_unary_masks(self, base: Optional["CompiledProblem"] = None) -> List[int]:
+        """Evaluate faculty_availability, room_capacity_check and room_type_match once per
+        faculty x slot and course class x room instead of per course x room x slot"""
+        constraints = self.constraints
+        faculty_data = self.faculty_data
+        room_data = self.room_data
+        
+        reusable = self._reusable_faculty(base)
+        self.faculty_slot_bits = faculty_slot_bits = []
+        for f in self.faculty:
+            if f.id in reusable:
+                faculty_slot_bits.append(base.faculty_slot_bits[reusable[f.id]])
+                continue
+            bits = 0
+            for s, slot in enumerate(self.time_slots):
+                probe = TimetableEntry("", f.id, "", slot.id)
+                if constraints.faculty_availability(probe, faculty_data):
+                    bits |= 1 << s
+            faculty_slot_bits.append(bits)
+        
+        # Courses with the same room requirements share one room bitset; the room
+        # bitsets of a base with the same rooms still hold
+        base_rooms = base.room_bits if base is not None and base.rooms == self.rooms else {}
+        self.room_bits: Dict[Tuple[str, int], int] = {}
+        patterns: Dict[Tuple[str, int], int] = {}
+        self.course_rooms = []
+        masks = []
+        for course, f in zip(self.courses, self.course_faculty):
+            key = (course.required_room_type, course.min_capacity)
+            if key not in patterns:
+                bits = base_rooms.get(key)
+                if bits is None:
+                    course_data = {course.id: course}
+                    bits = 0
+                    for r, room in enumerate(self.rooms):
+                        probe = TimetableEntry(course.id, course.faculty_id, room.id, "")
+                        if (constraints.room_capacity_check(probe, course_data, room_data) and
+                                constraints.room_type_match(probe, course_data, room_data)):
+                            bits |= 1 << r
+                self.room_bits[key] = bits
+                patterns[key] = self.room_values(bits)
+            bits, pattern = self.room_bits[key], patterns[key]
+            self.course_rooms.append(bits)
+            masks.append(faculty_slot_bits[f] * pattern if f >= 0 else 0)
+        return masks
+    
+    def _compile_enrollments(self, student_courses: List[StudentCourse]):
+        """Per-course student bitsets and the weighted graph of courses sharing students.
+        
+        ``enrollment[c]`` has bit i set when student i takes course c, and
+        ``student_conflicts[c]`` maps every course sharing students with c to the
+        number of students shared. The graph is built per student, so it costs the
+        sum of squared course loads rather than a comparison of every course pair.
+        """
+        student_index: Dict[str, int] = {}
+        taken_by: List[Set[int]] = [set() for _ in range(self.n_courses)]
+        courses_of: Dict[int, List[int]] = {}
+        for record in student_courses:
+            c = self.course_index.get(record.course_id)
+            if c is None:
+                continue
+            s = student_index.setdefault(record.student_id, len(student_index))
+            if s not in taken_by[c]:
+                taken_by[c].add(s)
+                courses_of.setdefault(s, []).append(c)
+        
+        self.n_students = len(student_index)
+        self.enrollment = [_bitset(students, self.n_students) for students in taken_by]
+        
+        self.student_conflicts: List[Dict[int, int]] = [{} for _ in range(self.n_courses)]
+        for taken in courses_of.values():
+            for c1 in taken:
+                shared = self.student_conflicts[c1]
+                for c2 in taken:
+                    if c2 != c1:
+                        shared[c2] = shared.get(c2, 0) + 1
+    
+    def _compile_neighbors(self):
+        """Course bitsets of the courses each course can conflict with.
+        
+        ``faculty_neighbors`` share the faculty member and ``student_neighbors``
+        share students; ``slot_neighbors`` is both, the courses that may not share
+        a slot. ``neighbors`` additionally holds every course whose unary mask
+        overlaps, i.e. that competes for at least one room at one slot.
+        """
+        n = self.n_courses
+        by_faculty: Dict[int, int] = {}
+        for c, f in enumerate(self.course_faculty):
+            if f >= 0:
+                by_faculty[f] = by_faculty.get(f, 0) | (1 << c)
+        
+        # Masks are (faculty slots x course rooms), so two masks overlap exactly when
+        # both the slot and the room bitsets overlap. The courses sharing a slot and
+        # those sharing a room are collected separately and intersected, once per
+        # distinct slot bitset and room bitset
+        slot_members = [0] * self.n_slots
+        room_members = [0] * self.n_rooms
+        for c, f in enumerate(self.course_faculty):
+            if self.unary_masks[c]:
+                for s in _iter_bits(self.faculty_slot_bits[f]):
+                    slot_members[s] |= 1 << c
+                for r in _iter_bits(self.course_rooms[c]):
+                    room_members[r] |= 1 << c
+        slot_overlaps: Dict[int, int] = {}
+        room_overlaps: Dict[int, int] = {}
+        group_neighbors: Dict[Tuple[int, int], int] = {}
+        for c, f in enumerate(self.course_faculty):
+            if not self.unary_masks[c]:
+                continue
+            slots, room_set = key = (self.faculty_slot_bits[f], self.course_rooms[c])
+            if key in group_neighbors:
+                continue
+            if slots not in slot_overlaps:
+                bits = 0
+                for s in _iter_bits(slots):
+                    bits |= slot_members[s]
+                slot_overlaps[slots] = bits
+            if room_set not in room_overlaps:
+                bits = 0
+                for r in _iter_bits(room_set):
+                    bits |= room_members[r]
+                room_overlaps[room_set] = bits
+            group_neighbors[key] = slot_overlaps[slots] & room_overlaps[room_set]
+        
+        self.student_neighbors = [_bitset(adjacent, n) if adjacent else 0 
+                                  for adjacent in self.student_conflicts]
+        
+        self.faculty_neighbors = [0] * n
+        self.slot_neighbors = [0] * n
+        self.neighbors = [0] * n
+        for c, f in enumerate(self.course_faculty):
+            if f < 0:
+                continue
+            self_bit = 1 << c
+            self.faculty_neighbors[c] = by_faculty[f] & ~self_bit
+            self.slot_neighbors[c] = self.faculty_neighbors[c] | self.student_neighbors[c]
+            key = (self.faculty_slot_bits[f], self.course_rooms[c])
+            self.neighbors[c] = (self.slot_neighbors[c] | group_neighbors.get(key, 0)) & ~self_bit
+    
+    def components(self) -> List[List[int]]:
+        """Connected components of the course interaction graph.
+        
+        Courses interact only through ``neighbors`` (a shared faculty member, shared
+        students or a room-time value both could take), so courses in different components can
+        never conflict and may be scheduled independently. Each component is grown
+        by OR-ing the neighbor bitsets of its frontier.
+        """
+        components = []
+        unvisited = (1 << self.n_courses) - 1
+        while unvisited:
+            component = frontier = unvisited & -unvisited
+            unvisited ^= frontier
+            while frontier:
+                reached = 0
+                for c in _iter_bits(frontier):
+                    reached |= self.neighbors[c]
+                frontier = reached & unvisited
+                unvisited ^= frontier
+                component |= frontier
+            components.append(list(_iter_bits(component)))
+        return components
+    
+    def subproblem(self, course_indices: List[int], 
+                   unary_masks: Optional[List[int]] = None) -> "CompiledProblem":
+        """Problem over a subset of the courses, sharing the faculty, room and slot encoding.
+        
+        Values mean the same in both problems, so a sub-solution is mapped back by
+        translating course indices alone. ``unary_masks`` may narrow the masks of
+        the selected courses, e.g. to exclude values held by pinned placements.
+        """
+        sub = object.__new__(CompiledProblem)
+        sub.__dict__.update(self.__dict__)
+        sub.courses = [self.courses[c] for c in course_indices]
+        sub.course_data = {c.id: c for c in sub.courses}
+        sub.course_index = {c.id: i for i, c in enumerate(sub.courses)}
+        sub.n_courses = len(sub.courses)
+        sub.course_faculty = [self.course_faculty[c] for c in course_indices]
+        sub.course_rooms = [self.course_rooms[c] for c in course_indices]
+        sub.enrollment = [self.enrollment[c] for c in course_indices]
+        position = {c: i for i, c in enumerate(course_indices)}
+        sub.student_conflicts = [{position[o]: shared for o, shared in self.student_conflicts[c].items() 
+                                  if o in position} for c in course_indices]
+        if unary_masks is None:
+            unary_masks = [self.unary_masks[c] for c in course_indices]
+        sub.unary_masks = list(unary_masks)
+        sub._compile_neighbors()
+        return sub
+    
+    def _compile_slot_preferences(self, base: Optional["CompiledProblem"] = None) -> List[List[float]]:
+        """faculty_preference score of every slot, per faculty member"""
+        constraints = self.constraints
+        faculty_data = self.faculty_data
+        reusable = self._reusable_faculty(base)
+        return [
+            base.slot_preference[reusable[f.id]] if f.id in reusable else
+            [constraints.faculty_preference(TimetableEntry("", f.id, "", slot.id), faculty_data)
+             for slot in self.time_slots]
+            for f in self.faculty
+        ]
+    
+    def decode(self, value: int) -> Tuple[int, int]:
+        """Split a value into (room_idx, slot_idx)"""
+        return divmod(value, self.n_slots)
+    
+    def slot_values(self, slot_bits: int) -> int:
+        """Expand a slot bitset into the values of those slots in every room"""
+        return slot_bits * self.room_repeat
+    
+    def room_values(self, room_bits: int) -> int:
+        """Expand a room bitset into the slot-0 value of each of those rooms"""
+        pattern = 0
+        for r in _iter_bits(room_bits):
+            pattern |= 1 << (r * self.n_slots)
+        return pattern
+    
+    def conflicting_values(self, course: int, value: int, other: int) -> int:
+        """Values of another course ruled out by placing a course at a value"""
+        if other == course or self.slot_neighbors[course] >> other & 1:
+            return self.slot_values(1 << (value % self.n_slots))
+        return 1 << value
+    
+    def entry(self, course_idx: int, value: int, conflict_score: float = 0.0) -> TimetableEntry:
+        """Materialize a TimetableEntry for a course placed at a value"""
+        room_idx, slot_idx = divmod(value, self.n_slots)
+        course = self.courses[course_idx]
+        return TimetableEntry(
+            course_id=course.id,
+            faculty_id=course.faculty_id,
+            room_id=self.rooms[room_idx].id,
+            time_slot_id=self.time_slots[slot_idx].id,
+            conflict_score=conflict_score
+        )
+
+class BitsetOccupancy(OccupancyIndex):
+    """OccupancyIndex backed by the integer encoding of a CompiledProblem.
+    
+    Generators work with ``place``/``remove`` and ``free_values``; the inherited
+    entry-level API keeps working so soft constraints can be evaluated against it.
+    """
+    
+    def __init__(self, problem: CompiledProblem):
+        self.problem = problem
+        self.room_slots = 0  # bit set for every occupied value
+        self.faculty_slots = [0] * len(problem.faculty)  # occupied slot bitset per faculty
+        self.faculty_hours = [0] * len(problem.faculty)
+        # Packed per-course state: value (room_idx * n_slots + slot_idx) or -1,
+        # conflict score, and courses in placement order; TimetableEntry objects
+        # are only built by ``entries``
+        self.assignment = array("i", [-1]) * problem.n_courses
+        self.scores = array("d", [0.0]) * problem.n_courses
+        self.order = array("i")
+        # With enrollments: per slot, the OR of the student bitsets of the courses
+        # placed there, and those courses as a bitset to rebuild it on removal
+        self.slot_students = [0] * problem.n_slots if problem.n_students else None
+        self.slot_courses = [0] * problem.n_slots if problem.n_students else None
+    
+    def place(self, course_idx: int, value: int, conflict_score: float = 0.0):
+        """Assign a course to a value"""
+        problem = self.problem
+        self.assignment[course_idx] = value
+        self.scores[course_idx] = conflict_score
+        self.order.append(course_idx)
+        self.room_slots |= 1 << value
+        f = problem.course_faculty[course_idx]
+        if f >= 0:
+            self.faculty_slots[f] |= 1 << (value % problem.n_slots)
+            self.faculty_hours[f] += 1
+        if self.slot_students is not None:
+            self._enter_slot(course_idx, value % problem.n_slots)
+    
+    def remove(self, course_idx: int):
+        """Undo the assignment of a course (most recent assignments are cheapest)"""
+        problem = self.problem
+        value = self.assignment[course_idx]
+        self.assignment[course_idx] = -1
+        if self.order and self.order[-1] == course_idx:
+            self.order.pop()
+        else:
+            self.order.remove(course_idx)
+        self.room_slots &= ~(1 << value)
+        f = problem.course_faculty[course_idx]
+        if f >= 0:
+            self.faculty_slots[f] &= ~(1 << (value % problem.n_slots))
+            self.faculty_hours[f] -= 1
+        if self.slot_students is not None:
+            self._leave_slot(course_idx, value % problem.n_slots)
+    
+    def _enter_slot(self, course_idx: int, slot_idx: int):
+        self.slot_courses[slot_idx] |= 1 << course_idx
+        self.slot_students[slot_idx] |= self.problem.enrollment[course_idx]
+    
+    def _leave_slot(self, course_idx: int, slot_idx: int):
+        # OR cannot be undone, so the slot's students are rebuilt from the courses left there
+        courses = self.slot_courses[slot_idx] & ~(1 << course_idx)
+        self.slot_courses[slot_idx] = courses
+        enrollment = self.problem.enrollment
+        students = 0
+        for c in _iter_bits(courses):
+            students |= enrollment[c]
+        self.slot_students[slot_idx] = students
+    
+    def student_blocked_slots(self, course_idx: int) -> int:
+        """Slot bitset of the slots holding a course that shares students with this one"""
+        students = self.problem.enrollment[course_idx]
+        blocked = 0
+        if students:
+            for slot_idx, taken in enumerate(self.slot_students):
+                if taken & students:
+                    blocked |= 1 << slot_idx
+        return blocked
+    
+    def can_move(self, course_idx: int, value: int) -> bool:
+        """Whether a placed course could be relocated to another value"""
+        problem = self.problem
+        # The unary mask may be narrower than the course's rooms and slots, e.g. in a repair
+        if self.room_slots >> value & 1 or not problem.unary_masks[course_idx] >> value & 1:
+            return False
+        slot_idx = value % problem.n_slots
+        if slot_idx == self.assignment[course_idx] % problem.n_slots:
+            return True
+        if self.faculty_slots[problem.course_faculty[course_idx]] >> slot_idx & 1:
+            return False
+        return self.slot_students is None or not problem.enrollment[course_idx] & self.slot_students[slot_idx]
+    
+    def move(self, course_idx: int, value: int, conflict_score: float = 0.0):
+        """Relocate a placed course without changing the placement order"""
+        problem = self.problem
+        old_value = self.assignment[course_idx]
+        self.assignment[course_idx] = value
+        self.scores[course_idx] = conflict_score
+        self.room_slots = self.room_slots & ~(1 << old_value) | (1 << value)
+        f = problem.course_faculty[course_idx]
+        self.faculty_slots[f] = (self.faculty_slots[f] & ~(1 << (old_value % problem.n_slots)) | 
+                                 (1 << (value % problem.n_slots)))
+        if self.slot_students is not None and old_value % problem.n_slots != value % problem.n_slots:
+            self._leave_slot(course_idx, old_value % problem.n_slots)
+            self._enter_slot(course_idx, value % problem.n_slots)
+    
+    def can_swap(self, course1: int, course2: int) -> bool:
+        """Whether two placed courses could exchange their values"""
+        problem = self.problem
+        value1, value2 = self.assignment[course1], self.assignment[course2]
+        if not (problem.unary_masks[course1] >> value2 & 1 and problem.unary_masks[course2] >> value1 & 1):
+            return False
+        f1, f2 = problem.course_faculty[course1], problem.course_faculty[course2]
+        slot1, slot2 = value1 % problem.n_slots, value2 % problem.n_slots
+        if slot1 == slot2:
+            return True
+        if f1 != f2 and (self.faculty_slots[f1] >> slot2 & 1 or self.faculty_slots[f2] >> slot1 & 1):
+            return False
+        if self.slot_courses is not None:
+            # Each course must not meet a student-sharing course in its new slot, other than the partner
+            neighbors = problem.student_neighbors
+            if (neighbors[course1] & self.slot_courses[slot2] & ~(1 << course2) or 
+                    neighbors[course2] & self.slot_courses[slot1] & ~(1 << course1)):
+                return False
+        return True
+    
+    def swap(self, course1: int, course2: int, score1: float = 0.0, score2: float = 0.0):
+        """Exchange the values of two placed courses"""
+        problem = self.problem
+        value1, value2 = self.assignment[course1], self.assignment[course2]
+        f1, f2 = problem.course_faculty[course1], problem.course_faculty[course2]
+        slot1, slot2 = 1 << (value1 % problem.n_slots), 1 << (value2 % problem.n_slots)
+        self.faculty_slots[f1] &= ~slot1
+        self.faculty_slots[f2] &= ~slot2
+        self.faculty_slots[f1] |= slot2
+        self.faculty_slots[f2] |= slot1
+        self.assignment[course1], self.assignment[course2] = value2, value1
+        self.scores[course1], self.scores[course2] = score1, score2
+        if self.slot_students is not None and slot1 != slot2:
+            slot1, slot2 = value1 % problem.n_slots, value2 % problem.n_slots
+            self._leave_slot(course1, slot1)
+            self._leave_slot(course2, slot2)
+            self._enter_slot(course1, slot2)
+            self._enter_slot(course2, slot1)
+    
+    def free_values(self, course_idx: int) -> int:
+        """Values of a course that satisfy every hard constraint given the current placements"""
+        problem = self.problem
+        mask = problem.unary_masks[course_idx] & ~self.room_slots
+        f = problem.course_faculty[course_idx]
+        if f >= 0 and self.faculty_slots[f]:
+            mask &= ~problem.slot_values(self.faculty_slots[f])
+        if self.slot_students is not None:
+            blocked = self.student_blocked_slots(course_idx)
+            if blocked:
+                mask &= ~problem.slot_values(blocked)
+        return mask
+    
+    def is_free(self, course_idx: int, value: int) -> bool:
+        """Point check of a single value against the current placements"""
+        if self.room_slots >> value & 1:
+            return False
+        problem = self.problem
+        slot_idx = value % problem.n_slots
+        f = problem.course_faculty[course_idx]
+        if f >= 0 and self.faculty_slots[f] >> slot_idx & 1:
+            return False
+        return self.slot_students is None or not problem.enrollment[course_idx] & self.slot_students[slot_idx]
+    
+    def assign(self, entry: TimetableEntry):
+        problem = self.problem
+        value = (problem.room_index[entry.room_id] * problem.n_slots + 
+                 problem.slot_index[entry.time_slot_id])
+        self.place(problem.course_index[entry.course_id], value, entry.conflict_score)
+    
+    def unassign(self, entry: TimetableEntry):
+        self.remove(self.problem.course_index[entry.course_id])
+    
+    def faculty_busy(self, faculty_id: str, time_slot_id: str) -> bool:
+        f = self.problem.faculty_index.get(faculty_id)
+        s = self.problem.slot_index.get(time_slot_id)
+        if f is None or s is None:
+            return False
+        return bool(self.faculty_slots[f] >> s & 1)
+    
+    def room_busy(self, room_id: str, time_slot_id: str) -> bool:
+        r = self.problem.room_index.get(room_id)
+        s = self.problem.slot_index.get(time_slot_id)
+        if r is None or s is None:
+            return False
+        return bool(self.room_slots >> (r * self.problem.n_slots + s) & 1)
+    
+    def hours(self, faculty_id: str) -> int:
+        f = self.problem.faculty_index.get(faculty_id)
+        return self.faculty_hours[f] if f is not None else 0
+    
+    def students_busy(self, course_id: str, time_slot_id: str) -> bool:
+        c = self.problem.course_index.get(course_id)
+        s = self.problem.slot_index.get(time_slot_id)
+        if c is None or s is None or self.slot_students is None:
+            return False
+        return bool(self.problem.enrollment[c] & self.slot_students[s])
+    
+    @property
+    def entries(self) -> List[TimetableEntry]:
+        return list(self.iter_entries())
+    
+    def iter_entries(self) -> Iterator[TimetableEntry]:
+        """Entries in placement order, built one at a time"""
+        for c in self.order:
+            yield self.problem.entry(c, self.assignment[c], self.scores[c])
+    
+    def __iter__(self):
+        return self.iter_entries()
+    
+    def __len__(self) -> int:
+        return len(self.order)
+
+class _HoursView(OccupancyIndex):
+    """Occupancy stand-in reporting a fixed hour count for one faculty member"""
+    
+    def __init__(self, faculty_id: str, hours: int):
+        self.faculty_id = faculty_id
+        self.fixed_hours = hours
+    
+    def hours(self, faculty_id: str) -> int:
+        return self.fixed_hours if faculty_id == self.faculty_id else 0
+
+class IncrementalScorer:
+    """Soft-constraint score of a schedule maintained under assign/remove/move/swap.
+    
+    The total is the sum of the scores greedy placement would give each entry: the
+    slot preference plus the workload, gap and clustering terms for the faculty's
+    hour count at that point. Those terms depend only on hour counts, so the total
+    does not depend on placement order and every delta is O(1) after the per
+    (course, hours) terms are memoized. Per-faculty, per-room, per-slot and per-day
+    aggregates are kept alongside for reporting.
+    """
+    
+    def __init__(self, problem: CompiledProblem):
+        self.problem = problem
+        self.constraints = problem.constraints
+        self.count = len(self.constraints.soft_constraints)
+        self.values = array("i", [-1]) * problem.n_courses
+        self.total = 0.0
+        self.scheduled = 0
+        self.faculty_hours = [0] * len(problem.faculty)
+        self.room_usage = [0] * problem.n_rooms
+        self.slot_usage = [0] * problem.n_slots
+        self.slot_days = [slot.day_of_week for slot in problem.time_slots]
+        self.day_usage: Dict[int, int] = {}
+        self._terms: Dict[Tuple[int, int], Tuple[float, float, float]] = {}
+        self.memo_hits = 0  # _course_terms lookups answered from the memo
+    
+    @classmethod
+    def from_occupancy(cls, schedule: BitsetOccupancy) -> 'IncrementalScorer':
+        scorer = cls(schedule.problem)
+        for course_idx in schedule.order:
+            scorer.assign(course_idx, schedule.assignment[course_idx])
+        return scorer
+    
+    def _course_terms(self, course_idx: int, hours: int) -> Tuple[float, float, float]:
+        """Workload, gap and clustering terms of a course whose faculty has ``hours``"""
+        key = (course_idx, hours)
+        terms = self._terms.get(key)
+        if terms is not None:
+            self.memo_hits += 1
+        else:
+            problem = self.problem
+            probe = problem.entry(course_idx, 0)
+            view = _HoursView(probe.faculty_id, hours)
+            terms = (self.constraints.balanced_workload(probe, view, problem.faculty_data),
+                     self.constraints.minimize_gaps(probe, view),
+                     self.constraints.department_clustering(probe, problem.course_data))
+            self._terms[key] = terms
+        return terms
+    
+    def _entry_score(self, course_idx: int, value: int, hours: int) -> float:
+        preference = self._preference(course_idx, value)
+        workload, gaps, clustering = self._course_terms(course_idx, hours)
+        # Same summation order as GreedyTimetableGenerator._combine_terms
+        return (((preference + workload) + gaps) + clustering) / self.count
+    
+    def _preference(self, course_idx: int, value: int) -> float:
+        problem = self.problem
+        return problem.slot_preference[problem.course_faculty[course_idx]][value % problem.n_slots]
+    
+    def delta_assign(self, course_idx: int, value: int) -> float:
+        f = self.problem.course_faculty[course_idx]
+        return self._entry_score(course_idx, value, self.faculty_hours[f])
+    
+    def delta_remove(self, course_idx: int) -> float:
+        f = self.problem.course_faculty[course_idx]
+        return -self._entry_score(course_idx, self.values[course_idx], self.faculty_hours[f] - 1)
+    
+    def delta_move(self, course_idx: int, value: int) -> float:
+        return (self._preference(course_idx, value) - 
+                self._preference(course_idx, self.values[course_idx])) / self.count
+    
+    def delta_swap(self, course1: int, course2: int) -> float:
+        value1, value2 = self.values[course1], self.values[course2]
+        return (self._preference(course1, value2) - self._preference(course1, value1) + 
+                self._preference(course2, value1) - self._preference(course2, value2)) / self.count
+    
+    def _count(self, value: int, sign: int):
+        room_idx, slot_idx = divmod(value, self.problem.n_slots)
+        self.room_usage[room_idx] += sign
+        self.slot_usage[slot_idx] += sign
+        day = self.slot_days[slot_idx]
+        self.day_usage[day] = self.day_usage.get(day, 0) + sign
+    
+    def assign(self, course_idx: int, value: int) -> float:
+        delta = self.delta_assign(course_idx, value)
+        self.total += delta
+        self.scheduled += 1
+        self.values[course_idx] = value
+        self.faculty_hours[self.problem.course_faculty[course_idx]] += 1
+        self._count(value, 1)
+        return delta
+    
+    def remove(self, course_idx: int) -> float:
+        delta = self.delta_remove(course_idx)
+        self.total += delta
+        self.scheduled -= 1
+        self.faculty_hours[self.problem.course_faculty[course_idx]] -= 1
+        self._count(self.values[course_idx], -1)
+        self.values[course_idx] = -1
+        return delta
+    
+    def move(self, course_idx: int, value: int) -> float:
+        delta = self.delta_move(course_idx, value)
+        self.total += delta
+        self._count(self.values[course_idx], -1)
+        self._count(value, 1)
+        self.values[course_idx] = value
+        return delta
+    
+    def swap(self, course1: int, course2: int) -> float:
+        # The same values stay occupied, so only the total changes
+        delta = self.delta_swap(course1, course2)
+        self.total += delta
+        self.values[course1], self.values[course2] = self.values[course2], self.values[course1]
+        return delta
+
+class _MRVHeap:
+    """Lazy min-heap of courses keyed on (remaining values, -degree, index).
+    
+    A new entry is pushed whenever a domain size changes; stale entries and
+    assigned courses are skipped when popping.
+    """
+    
+    def __init__(self, sizes: List[int], degrees: List[int]):
+        self.sizes = sizes
+        self.degrees = degrees
+        self.heap = [(size, -degrees[c], c) for c, size in enumerate(sizes)]
+        heapq.heapify(self.heap)
+    
+    def push(self, course: int):
+        heapq.heappush(self.heap, (self.sizes[course], -self.degrees[course], course))
+    
+    def update(self, course: int, delta: int):
+        self.sizes[course] += delta
+        self.push(course)
+    
+    def pop(self, assignment: Sequence[int]) -> int:
+        """Unassigned course (value -1) with the fewest remaining values"""
+        while True:
+            size, _, course = heapq.heappop(self.heap)
+            if assignment[course] < 0 and size == self.sizes[course]:
+                return course
+
 class GreedyTimetableGenerator:
     """Greedy algorithm for timetable generation"""
     
-    def __init__(self, constraints: TimetableConstraints):
+    ORDERINGS = ("priority", "most_constrained", "random", "dsatur")
+    
+    def __init__(self, constraints: TimetableConstraints, batched: bool = True,
+                 ordering: str = "priority", seed: int = 0):
+        if ordering not in self.ORDERINGS:
+            raise ValueError(f"Unknown greedy ordering: {ordering}")
         self.constraints = constraints
+        self.stats = SearchStats()
+        # Batched mode scores all room/slot candidates of a course at once; the
+        # scalar path is kept as the reference implementation
+        self.batched = batched
+        self.ordering = ordering
+        self.seed = seed
+        self.should_stop: Optional[Callable[[], bool]] = None
+        self.on_progress: Optional[Callable[[Dict], None]] = None
     
     def generate(self, courses: List[Course], faculty: List[Faculty], 
                 rooms: List[Room], time_slots: List[TimeSlot]) -> List[TimetableEntry]:
         """Generate timetable using greedy approach"""
+        problem = CompiledProblem(courses, faculty, rooms, time_slots, self.constraints)
+        return self.solve(problem).entries
+    
+    def solve(self, problem: CompiledProblem) -> BitsetOccupancy:
+        """Greedily place every course of a compiled problem"""
+        self.stats = SearchStats()
         
-        # Convert to dictionaries for faster lookup
-        faculty_data = {f.id: f for f in faculty}
-        room_data = {r.id: r for r in rooms}
-        course_data = {c.id: c for c in courses}
+        courses = problem.courses
+        schedule = BitsetOccupancy(problem)
         
-        schedule = []
-        unscheduled_courses = courses.copy()
+        with self.stats.phase("ordering"):
+            # Sort courses by priority (credits, semester, etc.)
+            order = sorted(range(problem.n_courses), 
+                           key=lambda i: (-courses[i].credits, courses[i].semester))
+            if self.ordering == "most_constrained":
+                order.sort(key=lambda i: problem.unary_masks[i].bit_count())
+            elif self.ordering == "random":
+                random.Random(self.seed).shuffle(order)
+            elif self.ordering == "dsatur":
+                order = self._dsatur_order(problem, schedule)  # chosen during placement
         
-        # Sort courses by priority (credits, semester, etc.)
-        unscheduled_courses.sort(key=lambda c: (-c.credits, c.semester))
+        batched = self.batched and self._uses_default_soft_constraints()
         
-        for course in unscheduled_courses:
-            best_entry = None
+        with self.stats.phase("placement"):
+            self._place_in_order(problem, order, schedule, batched)
+        return schedule
+    
+    def _dsatur_order(self, problem: CompiledProblem, schedule: BitsetOccupancy) -> Iterator[int]:
+        """Courses in DSatur order: always the one with the fewest free values next.
+        
+        Free value counts sit in a heap with the course's degree as tie-break.
+        After a placement only the unplaced slot neighbors (shared faculty or
+        students, which lose a whole slot) are recounted; losing a single value to
+        a room competitor is picked up lazily, by recounting a course when it
+        reaches the top of the heap. That keeps the cost near linear, since room
+        competitors can be most of the courses. Yields one course at a time, since
+        the next choice depends on where the previous one was put.
+        """
+        heap = _MRVHeap([mask.bit_count() for mask in problem.unary_masks], 
+                        [n.bit_count() for n in problem.neighbors])
+        sizes = heap.sizes
+        assignment = schedule.assignment
+        for _ in range(problem.n_courses):
+            while True:
+                course = heap.pop(assignment)
+                size = schedule.free_values(course).bit_count()
+                if size == sizes[course]:
+                    break
+                heap.update(course, size - sizes[course])
+            yield course
+            if assignment[course] < 0:
+                continue
+            for other in _iter_bits(problem.slot_neighbors[course]):
+                if assignment[other] < 0:
+                    size = schedule.free_values(other).bit_count()
+                    if size != sizes[other]:
+                        heap.update(other, size - sizes[other])
+    
+    def _place_in_order(self, problem: CompiledProblem, order: Iterable[int], 
+                        schedule: BitsetOccupancy, batched: bool):
+        """Place the courses one at a time at their best free value"""
+        faculty_data = problem.faculty_data
+        room_data = problem.room_data
+        course_data = problem.course_data
+        
+        for course_idx in order:
+            if self.should_stop is not None and self.should_stop():
+                # Keep what has been placed so far
+                self.stats.interrupted = True
+                break
+            self.stats.nodes += 1
+            if not self.stats.nodes & 63:
+                _report_progress(self.on_progress, len(schedule), problem.n_courses, self.stats.nodes)
+            if batched:
+                best_value, best_score = self._best_candidate(problem, course_idx, schedule)
+                if best_value >= 0:
+                    schedule.place(course_idx, best_value, best_score)
+                continue
+            
+            best_value = -1
             best_score = -1
             
-            # Try all combinations of rooms and time slots
-            for room in rooms:
-                for time_slot in time_slots:
-                    entry = TimetableEntry(
-                        course_id=course.id,
-                        faculty_id=course.faculty_id,
-                        room_id=room.id,
-                        time_slot_id=time_slot.id
-                    )
-                    
-                    # Check hard constraints
-                    if self._satisfies_hard_constraints(entry, schedule, faculty_data, 
-                                                      room_data, course_data):
-                        # Calculate soft constraint score
-                        score = self._calculate_soft_score(entry, schedule, faculty_data, 
-                                                         room_data, course_data)
-                        
-                        if score > best_score:
-                            best_score = score
-                            best_entry = entry
+            # Only room-time combinations that satisfy every hard constraint
+            self.stats.constraint_checks += 1
+            for value in _iter_bits(schedule.free_values(course_idx)):
+                entry = problem.entry(course_idx, value)
+                
+                # Calculate soft constraint score
+                score = self._calculate_soft_score(entry, schedule, faculty_data, 
+                                                 room_data, course_data)
+                
+                if score > best_score:
+                    best_score = score
+                    best_value = value
             
-            if best_entry:
-                best_entry.conflict_score = best_score
-                schedule.append(best_entry)
+            if best_value >= 0:
+                schedule.place(course_idx, best_value, best_score)
+    
+    def _uses_default_soft_constraints(self) -> bool:
+        """Batched scoring mirrors the built-in soft constraints only"""
+        c = self.constraints
+        return c.soft_constraints == [c.faculty_preference, c.balanced_workload, 
+                                      c.minimize_gaps, c.department_clustering]
+    
+    def _best_candidate(self, problem: CompiledProblem, course_idx: int, 
+                        schedule: BitsetOccupancy) -> Tuple[int, float]:
+        """Score every free room/slot candidate of a course in one pass.
         
-        return schedule
+        Returns the same (value, score) as the scalar loop: the highest score, ties
+        broken by the first candidate in room-major order.
+        """
+        self.stats.constraint_checks += 1
+        free = schedule.free_values(course_idx)
+        if not free:
+            self.stats.wipeouts += 1
+            return -1, -1
+        
+        # Only faculty_preference varies with the candidate (by slot, never by room);
+        # the other soft constraints are constant for the course in the current state
+        terms = self._course_terms(problem, course_idx, schedule)
+        
+        slots_by_score: Dict[float, int] = {}
+        preferences = problem.slot_preference[problem.course_faculty[course_idx]]
+        for slot_idx, preference in enumerate(preferences):
+            score = self._combine_terms(preference, terms)
+            slots_by_score[score] = slots_by_score.get(score, 0) | (1 << slot_idx)
+        
+        for score in sorted(slots_by_score, reverse=True):
+            candidates = free & problem.slot_values(slots_by_score[score])
+            if candidates:
+                return (candidates & -candidates).bit_length() - 1, score
+        return -1, -1
     
-    def _satisfies_hard_constraints(self, entry: TimetableEntry, schedule: List[TimetableEntry],
-                                   faculty_data: Dict, room_data: Dict, course_data: Dict) -> bool:
-        """Check if entry satisfies all hard constraints"""
-        for constraint in self.constraints.hard_constraints:
-            if constraint == self.constraints.faculty_availability:
-                if not constraint(entry, faculty_data):
-                    return False
-            elif constraint in [self.constraints.room_capacity_check, self.constraints.room_type_match]:
-                if not constraint(entry, course_data, room_data):
-                    return False
-            else:
-                if not constraint(entry, schedule):
-                    return False
-        return True
+    def _course_terms(self, problem: CompiledProblem, course_idx: int, 
+                      schedule: BitsetOccupancy) -> Tuple[float, float, float]:
+        """Room- and slot-independent soft constraint terms of placing a course now"""
+        probe = problem.entry(course_idx, 0)
+        return (self.constraints.balanced_workload(probe, schedule, problem.faculty_data),
+                self.constraints.minimize_gaps(probe, schedule),
+                self.constraints.department_clustering(probe, problem.course_data))
+    
+    def _combine_terms(self, preference: float, terms: Tuple[float, float, float]) -> float:
+        """Soft score from a slot preference and the course terms"""
+        # Summed in the same order as _calculate_soft_score so scores match bit for bit
+        workload, gaps, clustering = terms
+        return (((preference + workload) + gaps) + clustering) / len(self.constraints.soft_constraints)
     
-    def _calculate_soft_score(self, entry: TimetableEntry, schedule: List[TimetableEntry],
+    def _calculate_soft_score(self, entry: TimetableEntry, schedule: OccupancyIndex,
                              faculty_data: Dict, room_data: Dict, course_data: Dict) -> float:
         """Calculate soft constraint satisfaction score"""
         total_score = 0.0
@@ -234,335 +1175,1342 @@ class GreedyTimetableGenerator:
         
         return total_score / len(self.constraints.soft_constraints)
 
-class BacktrackingTimetableGenerator:
+class _SearchFrame:
+    """One level of the explicit search stack"""
+    __slots__ = ("course", "values", "value", "token", "conflicts")
+    
+    def __init__(self, course: int, values: Iterator[int], conflicts: Optional[int] = None):
+        self.course = course
+        self.values = values  # consumed lazily, so large domains are never materialized
+        self.value = -1
+        self.token = None  # undo information of the value currently applied
+        self.conflicts = conflicts  # bitset of courses blamed for failures, None disables backjumping
+
+class _DepthFirstSearch:
+    """Depth-first search over an explicit stack, shared by the complete generators.
+    
+    Subclasses provide the hooks below; the loop never recurses, so the number
+    of courses is not bounded by the interpreter recursion limit.
+    """
+    
+    # Seconds between should_stop polls; polling by time rather than node count
+    # keeps the latency of a stop bounded when single nodes are slow
+    CHECK_INTERVAL = 0.05
+    
+    def _checkpoint(self, placed: int):
+        """Poll should_stop and report progress once per CHECK_INTERVAL"""
+        now = time.perf_counter()
+        if now < self._next_check:
+            return
+        self._next_check = now + self.CHECK_INTERVAL
+        _raise_if_stopped(self.should_stop)
+        _report_progress(self.on_progress, placed, self._problem.n_courses, self.stats.nodes)
+    
+    def _next_course(self, depth: int) -> Optional[int]:
+        """Course to branch on at ``depth``, or None once every course is placed"""
+        raise NotImplementedError
+    
+    def _open(self, course: int) -> _SearchFrame:
+        """Frame holding the ordered candidate values of ``course``"""
+        raise NotImplementedError
+    
+    def _apply(self, course: int, value: int):
+        """Place ``course`` at ``value``; returns an undo token, or None if rejected"""
+        raise NotImplementedError
+    
+    def _retract(self, course: int, value: int, token):
+        """Undo an accepted ``_apply``"""
+        raise NotImplementedError
+    
+    def _close(self, course: int):
+        """Called when ``course`` is taken off the stack"""
+    
+    def _explain(self, frame: _SearchFrame) -> Optional[int]:
+        """Conflict set of a frame whose values have all failed"""
+        return frame.conflicts
+    
+    def _search(self) -> bool:
+        """Run the search to the first complete assignment"""
+        self._next_check = time.perf_counter() + self.CHECK_INTERVAL
+        course = self._next_course(0)
+        if course is None:
+            return True
+        stack = [self._open(course)]
+        failure: Optional[int] = None
+        
+        while stack:
+            frame = stack[-1]
+            if frame.token is not None:
+                # A child level failed: take back this level's value
+                self._retract(frame.course, frame.value, frame.token)
+                frame.token = None
+                if failure is not None and frame.conflicts is not None:
+                    if not failure >> frame.course & 1:
+                        # This value played no part in the failure below: jump past it
+                        self.stats.backjumps += 1
+                        self._close(frame.course)
+                        stack.pop()
+                        continue
+                    frame.conflicts |= failure & ~(1 << frame.course)
+            
+            for value in frame.values:
+                token = self._apply(frame.course, value)
+                if token is not None:
+                    frame.value = value
+                    frame.token = token
+                    break
+            
+            if frame.token is None:
+                failure = self._explain(frame)
+                self._close(frame.course)
+                stack.pop()
+                continue
+            
+            course = self._next_course(len(stack))
+            if course is None:
+                return True
+            stack.append(self._open(course))
+        
+        return False
+
+def _luby(i: int) -> int:
+    """i-th term (1-based) of the Luby sequence 1, 1, 2, 1, 1, 2, 4, 1, ..."""
+    k = 1
+    while (1 << k) - 1 < i:
+        k += 1
+    while i != (1 << k) - 1:
+        i -= (1 << (k - 1)) - 1
+        k = 1
+        while (1 << k) - 1 < i:
+            k += 1
+    return 1 << (k - 1)
+
+class _RestartSearch(Exception):
+    """Raised when a search run exhausts its node limit"""
+
+class BacktrackingTimetableGenerator(_DepthFirstSearch):
     """Backtracking algorithm for timetable generation"""
     
-    def __init__(self, constraints: TimetableConstraints):
+    RESTART_SCHEDULES = ("luby", "geometric")
+    
+    def __init__(self, constraints: TimetableConstraints, backjumping: bool = True,
+                 restarts: bool = False, seed: int = 0, restart_schedule: str = "luby",
+                 base_node_limit: int = 100, geometric_factor: float = 1.5,
+                 max_nodes: Optional[int] = None):
+        if restart_schedule not in self.RESTART_SCHEDULES:
+            raise ValueError(f"Unknown restart schedule: {restart_schedule}")
         self.constraints = constraints
         self.solutions = []
+        self.stats = SearchStats()
+        self.should_stop: Optional[Callable[[], bool]] = None
+        self.on_progress: Optional[Callable[[Dict], None]] = None
+        # Conflict-directed backjumping skips courses that played no part in a failure
+        self.backjumping = backjumping
+        # Restart mode shuffles value order and restarts when a run's node limit is hit
+        self.restarts = restarts
+        self.seed = seed
+        self.restart_schedule = restart_schedule
+        self.base_node_limit = base_node_limit
+        self.geometric_factor = geometric_factor
+        # Hard cap on nodes over all runs, bounding worst-case latency
+        self.max_nodes = max_nodes
     
     def generate(self, courses: List[Course], faculty: List[Faculty], 
                 rooms: List[Room], time_slots: List[TimeSlot]) -> List[TimetableEntry]:
         """Generate timetable using backtracking"""
-        
-        faculty_data = {f.id: f for f in faculty}
-        room_data = {r.id: r for r in rooms}
-        course_data = {c.id: c for c in courses}
-        
-        schedule = []
-        
-        if self._backtrack(courses, 0, schedule, faculty_data, room_data, 
-                          course_data, rooms, time_slots):
-            return schedule
-        
-        return []  # No solution found
+        problem = CompiledProblem(courses, faculty, rooms, time_slots, self.constraints)
+        return self.solve(problem).entries
     
-    def _backtrack(self, courses: List[Course], course_index: int, 
-                   schedule: List[TimetableEntry], faculty_data: Dict, 
-                   room_data: Dict, course_data: Dict, rooms: List[Room], 
-                   time_slots: List[TimeSlot]) -> bool:
-        """Recursive backtracking function"""
+    def solve(self, problem: CompiledProblem) -> BitsetOccupancy:
+        """Place every course of a compiled problem, or none if that is impossible"""
+        self.stats = SearchStats()
+        self._rng = random.Random(self.seed)
+        run = 0
         
-        if course_index >= len(courses):
-            return True  # All courses scheduled successfully
+        self._problem = problem
         
-        course = courses[course_index]
-        
-        # Try all room-time combinations
-        for room in rooms:
-            for time_slot in time_slots:
-                entry = TimetableEntry(
-                    course_id=course.id,
-                    faculty_id=course.faculty_id,
-                    room_id=room.id,
-                    time_slot_id=time_slot.id
-                )
-                
-                if self._is_valid_assignment(entry, schedule, faculty_data, 
-                                           room_data, course_data):
-                    schedule.append(entry)
-                    
-                    if self._backtrack(courses, course_index + 1, schedule, 
-                                     faculty_data, room_data, course_data, 
-                                     rooms, time_slots):
-                        return True
-                    
-                    # Backtrack
-                    schedule.pop()
+        try:
+            while True:
+                self._schedule = BitsetOccupancy(problem)
+                self._run_limit = self._node_limit(run) if self.restarts else None
+                self._run_nodes = 0
+                try:
+                    with self.stats.phase("search"):
+                        found = self._search()
+                    if found:
+                        return self._schedule
+                    break  # Search space exhausted
+                except _RestartSearch:
+                    run += 1
+                    self.stats.restarts += 1
+        except SearchInterrupted:
+            self.stats.interrupted = True
         
-        return False
+        return BitsetOccupancy(problem)  # No solution found
     
-    def _is_valid_assignment(self, entry: TimetableEntry, schedule: List[TimetableEntry],
-                            faculty_data: Dict, room_data: Dict, course_data: Dict) -> bool:
-        """Check if assignment is valid"""
-        for constraint in self.constraints.hard_constraints:
-            if constraint == self.constraints.faculty_availability:
-                if not constraint(entry, faculty_data):
-                    return False
-            elif constraint in [self.constraints.room_capacity_check, self.constraints.room_type_match]:
-                if not constraint(entry, course_data, room_data):
-                    return False
+    def _node_limit(self, run: int) -> int:
+        """Node limit of the run-th restart"""
+        if self.restart_schedule == "luby":
+            return self.base_node_limit * _luby(run + 1)
+        return int(self.base_node_limit * self.geometric_factor ** run)
+    
+    def _next_course(self, depth: int) -> Optional[int]:
+        # Courses are placed in input order, so depth and course index coincide
+        return depth if depth < self._problem.n_courses else None
+    
+    def _open(self, course: int) -> _SearchFrame:
+        # Try all valid room-time combinations
+        self.stats.constraint_checks += 1
+        free = self._schedule.free_values(course)
+        if not free:
+            self.stats.wipeouts += 1
+        values = _iter_bits(free)
+        if self.restarts:
+            values = list(values)
+            self._rng.shuffle(values)
+        return _SearchFrame(course, iter(values), 0)
+    
+    def _apply(self, course: int, value: int):
+        self._count_node()
+        self._schedule.place(course, value)
+        return value
+    
+    def _retract(self, course: int, value: int, token):
+        self.stats.backtracks += 1
+        self._schedule.remove(course)
+    
+    def _explain(self, frame: _SearchFrame) -> Optional[int]:
+        # Culprits are only needed at dead ends, so they are not computed on the way down
+        if not self.backjumping:
+            return (1 << frame.course) - 1  # chronological: blame every earlier course
+        return frame.conflicts | self._culprits(self._problem, frame.course, self._schedule)
+    
+    def _culprits(self, problem: CompiledProblem, course_index: int, 
+                  schedule: BitsetOccupancy) -> int:
+        """Earlier courses whose placements rule out values of this course"""
+        mask = problem.unary_masks[course_index]
+        culprits = 0
+        for other in _iter_bits(problem.neighbors[course_index] & ((1 << course_index) - 1)):
+            value = schedule.assignment[other]
+            if problem.slot_neighbors[course_index] >> other & 1:
+                blocked = mask & problem.slot_values(1 << (value % problem.n_slots))
             else:
-                if not constraint(entry, schedule):
-                    return False
-        return True
+                blocked = mask >> value & 1
+            if blocked:
+                culprits |= 1 << other
+        return culprits
+    
+    def _count_node(self):
+        self.stats.nodes += 1
+        self._run_nodes += 1
+        self._checkpoint(len(self._schedule))
+        if self.max_nodes is not None and self.stats.nodes > self.max_nodes:
+            raise SearchInterrupted()
+        if self._run_limit is not None and self._run_nodes > self._run_limit:
+            raise _RestartSearch()
 
-class CSPTimetableGenerator:
+class CSPTimetableGenerator(_DepthFirstSearch):
     """Constraint Satisfaction Problem approach for timetable generation"""
     
-    def __init__(self, constraints: TimetableConstraints):
+    VALUE_ORDERS = ("lcv", "preference", "random")
+    
+    def __init__(self, constraints: TimetableConstraints, value_order: str = "lcv", seed: int = 0,
+                 detailed_timing: bool = False):
+        if value_order not in self.VALUE_ORDERS:
+            raise ValueError(f"Unknown value order: {value_order}")
         self.constraints = constraints
+        self.stats = SearchStats()
+        self.value_order = value_order
+        self.seed = seed
+        # Also time value ordering and forward checking per node; adds timer
+        # overhead to every placement, so it is off unless profiling
+        self.detailed_timing = detailed_timing
+        self.should_stop: Optional[Callable[[], bool]] = None
+        self.on_progress: Optional[Callable[[Dict], None]] = None
     
     def generate(self, courses: List[Course], faculty: List[Faculty], 
                 rooms: List[Room], time_slots: List[TimeSlot]) -> List[TimetableEntry]:
         """Generate timetable using CSP with arc consistency and heuristics"""
+        problem = CompiledProblem(courses, faculty, rooms, time_slots, self.constraints)
+        return self.solve(problem).entries
+    
+    def solve(self, problem: CompiledProblem) -> BitsetOccupancy:
+        """Place every course of a compiled problem, or none if that is impossible"""
+        self.stats = SearchStats()
         
-        faculty_data = {f.id: f for f in faculty}
-        room_data = {r.id: r for r in rooms}
-        course_data = {c.id: c for c in courses}
-        
-        # Create domains for each course (possible room-time combinations)
-        domains = {}
-        for course in courses:
-            domains[course.id] = []
-            for room in rooms:
-                for time_slot in time_slots:
-                    entry = TimetableEntry(
-                        course_id=course.id,
-                        faculty_id=course.faculty_id,
-                        room_id=room.id,
-                        time_slot_id=time_slot.id
-                    )
-                    
-                    # Only include if it satisfies basic constraints
-                    if self._satisfies_unary_constraints(entry, faculty_data, 
-                                                       room_data, course_data):
-                        domains[course.id].append(entry)
-        
-        # Apply arc consistency
-        self._arc_consistency(domains, courses, faculty_data, room_data, course_data)
-        
-        # Use backtracking with MRV and LCV heuristics
-        assignment = {}
-        if self._csp_backtrack(assignment, domains, courses, faculty_data, 
-                              room_data, course_data):
-            return list(assignment.values())
-        
-        return []
-    
-    def _satisfies_unary_constraints(self, entry: TimetableEntry, faculty_data: Dict,
-                                   room_data: Dict, course_data: Dict) -> bool:
-        """Check unary constraints (constraints involving single variable)"""
-        return (self.constraints.faculty_availability(entry, faculty_data) and
-                self.constraints.room_capacity_check(entry, course_data, room_data) and
-                self.constraints.room_type_match(entry, course_data, room_data))
-    
-    def _arc_consistency(self, domains: Dict, courses: List[Course], 
-                        faculty_data: Dict, room_data: Dict, course_data: Dict):
-        """Apply arc consistency to reduce domains"""
-        changed = True
-        while changed:
-            changed = False
-            for course1 in courses:
-                for course2 in courses:
-                    if course1.id != course2.id:
-                        if self._revise(domains, course1.id, course2.id, faculty_data, room_data):
-                            changed = True
-    
-    def _revise(self, domains: Dict, course1_id: str, course2_id: str,
-               faculty_data: Dict, room_data: Dict) -> bool:
-        """Revise domain of course1 with respect to course2"""
-        revised = False
-        to_remove = []
-        
-        for entry1 in domains[course1_id]:
-            consistent = False
-            for entry2 in domains[course2_id]:
-                if self._consistent(entry1, entry2, faculty_data, room_data):
-                    consistent = True
-                    break
-            
-            if not consistent:
-                to_remove.append(entry1)
-                revised = True
+        # Domains are bitsets of the room-time values satisfying the unary constraints
+        domains = list(problem.unary_masks)
         
-        for entry in to_remove:
-            domains[course1_id].remove(entry)
+        try:
+            # Apply arc consistency
+            with self.stats.phase("arc_consistency"):
+                consistent = self._arc_consistency(problem, domains)
+            if not consistent:
+                return BitsetOccupancy(problem)
+            
+            # Use backtracking with MRV and LCV heuristics
+            occupancy = BitsetOccupancy(problem)
+            assignment = occupancy.assignment
+            trail = []
+            mrv = _MRVHeap([d.bit_count() for d in domains], 
+                           [n.bit_count() for n in problem.neighbors])
+            self._rng = random.Random(self.seed)
+            self._problem, self._assignment, self._occupancy = problem, assignment, occupancy
+            self._domains, self._trail, self._mrv = domains, trail, mrv
+            with self.stats.phase("search"):
+                found = self._search()
+            if found:
+                return occupancy
+        except SearchInterrupted:
+            self.stats.interrupted = True
         
-        return revised
+        return BitsetOccupancy(problem)
     
-    def _consistent(self, entry1: TimetableEntry, entry2: TimetableEntry,
-                   faculty_data: Dict, room_data: Dict) -> bool:
-        """Check if two entries are consistent"""
-        # Faculty conflict
-        if (entry1.faculty_id == entry2.faculty_id and 
-            entry1.time_slot_id == entry2.time_slot_id):
-            return False
+    def _arc_consistency(self, problem: CompiledProblem, domains: List[int]) -> bool:
+        """Queue-driven AC-3; returns False when a domain is wiped out.
         
-        # Room conflict
-        if (entry1.room_id == entry2.room_id and 
-            entry1.time_slot_id == entry2.time_slot_id):
-            return False
+        An arc (course1, course2) can only remove values from course1 when course2
+        is down to a single slot (shared faculty or students) or a single value
+        (shared room), so only those arcs are queued, and only towards actual neighbors.
+        Raises SearchInterrupted when should_stop fires, polled every 256 arcs.
+        """
+        queue = deque()
+        queued = set()
+        
+        def enqueue_arcs_into(course2: int):
+            for course1 in _iter_bits(self._restricted_neighbors(problem, domains, course2)):
+                if (course1, course2) not in queued:
+                    queued.add((course1, course2))
+                    queue.append((course1, course2))
+        
+        for course in range(problem.n_courses):
+            if not domains[course]:
+                self.stats.wipeouts += 1
+                return False
+            enqueue_arcs_into(course)
+        
+        revisions = 0
+        while queue:
+            revisions += 1
+            if not revisions & 255:
+                _raise_if_stopped(self.should_stop)
+            arc = queue.popleft()
+            queued.discard(arc)
+            course1, course2 = arc
+            self.stats.constraint_checks += 1
+            if self._revise(problem, domains, course1, course2):
+                if not domains[course1]:
+                    self.stats.wipeouts += 1
+                    return False
+                enqueue_arcs_into(course1)
         
         return True
     
-    def _csp_backtrack(self, assignment: Dict, domains: Dict, courses: List[Course],
-                      faculty_data: Dict, room_data: Dict, course_data: Dict) -> bool:
-        """CSP backtracking with heuristics"""
+    def _restricted_neighbors(self, problem: CompiledProblem, domains: List[int], course: int) -> int:
+        """Neighbors whose domains a course can currently prune"""
+        domain = domains[course]
+        low = domain & -domain
+        if domain == low:
+            return problem.neighbors[course]
+        if domain & ~problem.slot_values(1 << ((low.bit_length() - 1) % problem.n_slots)):
+            return 0
+        return problem.slot_neighbors[course]
+    
+    def _revise(self, problem: CompiledProblem, domains: List[int], 
+               course1: int, course2: int) -> bool:
+        """Revise domain of course1 with respect to course2"""
+        domain2 = domains[course2]
+        low = domain2 & -domain2
+        if problem.slot_neighbors[course1] >> course2 & 1:
+            # Values of course1 are unsupported only when every value of course2 is in their slot
+            column = problem.slot_values(1 << ((low.bit_length() - 1) % problem.n_slots))
+            if domain2 & ~column:
+                return False
+            removed = domains[course1] & column
+        else:
+            # Room conflict only: a value is unsupported only if it is course2's last value
+            if domain2 != low:
+                return False
+            removed = domains[course1] & low
         
-        if len(assignment) == len(courses):
+        if removed:
+            domains[course1] &= ~removed
             return True
+        return False
+    
+    def _next_course(self, depth: int) -> Optional[int]:
+        if len(self._occupancy) == self._problem.n_courses:
+            return None
+        # MRV: Choose variable with minimum remaining values, most neighbors first on ties
+        return self._mrv.pop(self._assignment)
+    
+    def _open(self, course: int) -> _SearchFrame:
+        if self.detailed_timing:
+            with self.stats.phase("value_ordering"):
+                return self._open_values(course)
+        return self._open_values(course)
+    
+    def _open_values(self, course: int) -> _SearchFrame:
+        problem, domains = self._problem, self._domains
+        # LCV: Order values by least constraining value
+        if self.value_order == "lcv":
+            domain_values = self._order_values(problem, course, domains, self._assignment)
+        elif self.value_order == "preference":
+            preferences = problem.slot_preference[problem.course_faculty[course]]
+            domain_values = sorted(_iter_bits(domains[course]), 
+                                   key=lambda value: -preferences[value % problem.n_slots])
+        else:
+            domain_values = list(_iter_bits(domains[course]))
+            self._rng.shuffle(domain_values)
+        return _SearchFrame(course, iter(domain_values))
+    
+    def _apply(self, course: int, value: int):
+        """Place a value and forward check it.
         
-        # MRV: Choose variable with minimum remaining values
-        unassigned_courses = [c for c in courses if c.id not in assignment]
-        course = min(unassigned_courses, key=lambda c: len(domains[c.id]))
+        Domain reductions are recorded on the trail as (course, removed values),
+        so backtracking only undoes what forward checking actually changed; the
+        returned token is the trail mark to undo to.
+        """
+        occupancy, trail = self._occupancy, self._trail
+        self.stats.constraint_checks += 1
+        if not occupancy.is_free(course, value):
+            return None
+        self.stats.nodes += 1
+        self._checkpoint(len(occupancy))
+        occupancy.place(course, value)
         
-        # LCV: Order values by least constraining value
-        domain_values = sorted(domains[course.id], 
-                             key=lambda entry: self._count_conflicts(entry, domains, assignment))
+        # Forward checking
+        mark = len(trail)
+        if self.detailed_timing:
+            with self.stats.phase("forward_checking"):
+                consistent = self._forward_check(self._problem, self._domains, course, value, 
+                                                 self._assignment, trail, self._mrv)
+        else:
+            consistent = self._forward_check(self._problem, self._domains, course, value, 
+                                             self._assignment, trail, self._mrv)
+        if len(trail) > self.stats.peak_trail_size:
+            self.stats.peak_trail_size = len(trail)
         
-        for entry in domain_values:
-            if self._is_consistent_with_assignment(entry, assignment):
-                assignment[course.id] = entry
-                
-                # Forward checking
-                old_domains = self._forward_check(domains, course.id, entry, assignment)
-                
-                if all(len(domain) > 0 for cid, domain in domains.items() if cid not in assignment):
-                    if self._csp_backtrack(assignment, domains, courses, 
-                                         faculty_data, room_data, course_data):
-                        return True
-                
-                # Restore domains
-                domains.update(old_domains)
-                del assignment[course.id]
+        if consistent:
+            return mark
+        self._retract(course, value, mark)
+        return None
+    
+    def _retract(self, course: int, value: int, token):
+        # Restore domains
+        self.stats.backtracks += 1
+        self._undo(self._domains, self._trail, token, self._mrv)
+        self._occupancy.remove(course)
+    
+    def _close(self, course: int):
+        self._mrv.push(course)
+    
+    def _order_values(self, problem: CompiledProblem, course: int, domains: List[int], 
+                      assignment: Sequence[int]) -> List[int]:
+        """Sort a course's values by how many values each would eliminate from other domains.
         
-        return False
+        Courses sharing the faculty member or students lose the whole slot column,
+        so their losses are counted per slot; room competitors lose at most the value
+        itself, so their domains are summed into a bit-sliced counter and each
+        value reads its count back from the bit planes. Only neighbors are visited.
+        """
+        domain = domains[course]
+        n_slots = problem.n_slots
+        
+        column_losses = [0] * n_slots
+        same_slot = [course] + [c for c in _iter_bits(problem.slot_neighbors[course]) 
+                                if assignment[c] < 0]
+        for slot_idx in range(n_slots):
+            column = problem.slot_values(1 << slot_idx)
+            column_losses[slot_idx] = sum((domains[c] & column).bit_count() for c in same_slot)
+        
+        planes: List[int] = []
+        for other in _iter_bits(problem.neighbors[course] & ~problem.slot_neighbors[course]):
+            if assignment[other] < 0:
+                carry = domains[other] & domain
+                for i in range(len(planes)):
+                    if not carry:
+                        break
+                    planes[i], carry = planes[i] ^ carry, planes[i] & carry
+                if carry:
+                    planes.append(carry)
+        
+        def conflicts(value: int) -> int:
+            count = column_losses[value % n_slots]
+            for i, plane in enumerate(planes):
+                count += (plane >> value & 1) << i
+            return count
+        
+        return sorted(_iter_bits(domain), key=conflicts)
     
-    def _count_conflicts(self, entry: TimetableEntry, domains: Dict, assignment: Dict) -> int:
-        """Count how many values this entry would eliminate from other domains"""
-        conflicts = 0
-        for course_id, domain in domains.items():
-            if course_id not in assignment:
-                for other_entry in domain:
-                    if not self._consistent(entry, other_entry, {}, {}):
-                        conflicts += 1
-        return conflicts
-    
-    def _is_consistent_with_assignment(self, entry: TimetableEntry, assignment: Dict) -> bool:
-        """Check if entry is consistent with current assignment"""
-        for assigned_entry in assignment.values():
-            if not self._consistent(entry, assigned_entry, {}, {}):
-                return False
+    def _forward_check(self, problem: CompiledProblem, domains: List[int], 
+                      assigned_course: int, assigned_value: int, 
+                      assignment: Sequence[int], trail: List[Tuple[int, int]], 
+                      mrv: _MRVHeap) -> bool:
+        """Forward checking: remove inconsistent values from neighboring domains.
+        Returns False as soon as a domain is wiped out."""
+        stats = self.stats
+        for course in _iter_bits(problem.neighbors[assigned_course]):
+            if assignment[course] < 0:
+                stats.constraint_checks += 1
+                removed = domains[course] & problem.conflicting_values(assigned_course, assigned_value, 
+                                                                       course)
+                if removed:
+                    domains[course] ^= removed
+                    trail.append((course, removed))
+                    mrv.update(course, -removed.bit_count())
+                    if not domains[course]:
+                        stats.wipeouts += 1
+                        return False
         return True
     
-    def _forward_check(self, domains: Dict, assigned_course_id: str, 
-                      assigned_entry: TimetableEntry, assignment: Dict) -> Dict:
-        """Forward checking: remove inconsistent values from domains"""
-        old_domains = {}
+    def _undo(self, domains: List[int], trail: List[Tuple[int, int]], mark: int, mrv: _MRVHeap):
+        """Restore the values removed since the trail was at ``mark``"""
+        while len(trail) > mark:
+            course, removed = trail.pop()
+            domains[course] |= removed
+            mrv.update(course, removed.bit_count())
+
+class LocalSearchTimetableGenerator(GreedyTimetableGenerator):
+    """Anytime simulated annealing that improves the greedy schedule within a time budget.
+    
+    With ``max_iterations`` the cooling schedule runs over the iterations rather
+    than the budget, so a seeded run that finishes within the budget always
+    returns the same schedule.
+    """
+    
+    def __init__(self, constraints: TimetableConstraints, time_budget: float = 2.0, 
+                 seed: int = 0, max_iterations: Optional[int] = None,
+                 initial_temperature: float = 0.05, final_temperature: float = 0.001):
+        super().__init__(constraints)
+        self.time_budget = time_budget
+        self.seed = seed
+        self.max_iterations = max_iterations
+        self.initial_temperature = initial_temperature
+        self.final_temperature = final_temperature
+    
+    def solve(self, problem: CompiledProblem) -> BitsetOccupancy:
+        """Seed with the greedy schedule, then apply move/swap neighborhoods"""
+        start = time.perf_counter()
+        deadline = start + self.time_budget
+        schedule = super().solve(problem)
+        self.stats.phases["initial"] = time.perf_counter() - start
+        with self.stats.phase("improvement"):
+            return self._improve(problem, schedule, start, deadline)
+    
+    def _improve(self, problem: CompiledProblem, schedule: BitsetOccupancy, 
+                 start: float, deadline: float) -> BitsetOccupancy:
+        """Simulated annealing from an initial schedule; returns the best schedule seen"""
+        scorer = IncrementalScorer.from_occupancy(schedule)
+        rng = random.Random(self.seed)
+        n_slots = problem.n_slots
+        
+        preferences = [problem.slot_preference[f] if f >= 0 else [] for f in problem.course_faculty]
+        room_choices = [list(_iter_bits(bits)) for bits in problem.course_rooms]
+        slot_choices = [list(_iter_bits(problem.faculty_slot_bits[f])) if f >= 0 else [] 
+                        for f in problem.course_faculty]
+        best_preference = [max((preferences[c][s] for s in slot_choices[c]), default=0.0) 
+                           for c in range(problem.n_courses)]
+        
+        def below_best(course: int, value: int) -> int:
+            return preferences[course][value % n_slots] < best_preference[course]
+        
+        unscheduled = [c for c in range(problem.n_courses) 
+                       if schedule.assignment[c] < 0 and problem.unary_masks[c]]
+        courses_below_best = sum(below_best(c, schedule.assignment[c]) for c in schedule.order)
+        
+        best_key = (scorer.scheduled, scorer.total)
+        best = (schedule.order[:], schedule.assignment[:], schedule.scores[:])
+        
+        iteration = 0
+        while courses_below_best or unscheduled:
+            if self.max_iterations is not None and iteration >= self.max_iterations:
+                break
+            now = time.perf_counter()
+            if now >= deadline:
+                break
+            if not iteration & 255:
+                if self.should_stop is not None and self.should_stop():
+                    self.stats.interrupted = True
+                    break
+                _report_progress(self.on_progress, best_key[0], problem.n_courses, self.stats.nodes, 
+                                 best_key[1] / best_key[0] if best_key[0] else None)
+            iteration += 1
+            self.stats.nodes += 1
+            
+            if unscheduled and rng.random() < 0.5:
+                # Insert an unscheduled course wherever it fits; always an improvement
+                i = rng.randrange(len(unscheduled))
+                course = unscheduled[i]
+                self.stats.constraint_checks += 1
+                free = schedule.free_values(course)
+                if not free:
+                    continue
+                value = next(itertools.islice(_iter_bits(free), rng.randrange(free.bit_count()), None))
+                schedule.place(course, value, scorer.assign(course, value))
+                unscheduled[i] = unscheduled[-1]
+                unscheduled.pop()
+                courses_below_best += below_best(course, value)
+            elif not schedule.order:
+                break
+            else:
+                # An iteration-based schedule keeps seeded runs with max_iterations
+                # reproducible; otherwise the temperature follows the time budget
+                if self.max_iterations:
+                    fraction = iteration / self.max_iterations
+                else:
+                    fraction = (now - start) / self.time_budget if self.time_budget > 0 else 1.0
+                temperature = self.initial_temperature * (
+                    self.final_temperature / self.initial_temperature) ** min(fraction, 1.0)
+                course = rng.choice(schedule.order)
+                old_value = schedule.assignment[course]
+                
+                if rng.random() < 0.5:
+                    # Move: relocate one course to another room/slot
+                    value = (rng.choice(room_choices[course]) * n_slots + 
+                             rng.choice(slot_choices[course]))
+                    if value == old_value:
+                        continue
+                    self.stats.constraint_checks += 1
+                    if not schedule.can_move(course, value):
+                        continue
+                    delta = scorer.delta_move(course, value)
+                    if delta < 0 and rng.random() >= math.exp(delta / temperature):
+                        continue
+                    courses_below_best += below_best(course, value) - below_best(course, old_value)
+                    scorer.move(course, value)
+                    schedule.move(course, value, schedule.scores[course] + delta)
+                else:
+                    # Swap: exchange the placements of two courses
+                    other = rng.choice(schedule.order)
+                    other_value = schedule.assignment[other]
+                    if other == course:
+                        continue
+                    self.stats.constraint_checks += 1
+                    if not schedule.can_swap(course, other):
+                        continue
+                    delta = scorer.delta_swap(course, other)
+                    if delta < 0 and rng.random() >= math.exp(delta / temperature):
+                        continue
+                    courses_below_best += (below_best(course, other_value) + below_best(other, old_value) - 
+                                           below_best(course, old_value) - below_best(other, other_value))
+                    course_delta = scorer.delta_move(course, other_value)
+                    scorer.swap(course, other)
+                    schedule.swap(course, other, schedule.scores[course] + course_delta, 
+                                  schedule.scores[other] + delta - course_delta)
+            
+            key = (scorer.scheduled, scorer.total)
+            if key > best_key:
+                best_key = key
+                best = (schedule.order[:], schedule.assignment[:], schedule.scores[:])
+        
+        self.stats.cache_hits += scorer.memo_hits
+        order, assignment, scores = best
+        result = BitsetOccupancy(problem)
+        for c in order:
+            result.place(c, assignment[c], scores[c])
+        return result
+
+# Worker-process state for portfolio solving; installed once per worker by the pool
+# initializer so the compiled problem is not re-sent with every task
+_portfolio_problem: Optional[CompiledProblem] = None
+_portfolio_stop = None
+
+def _init_portfolio_worker(problem: CompiledProblem, stop_event):
+    global _portfolio_problem, _portfolio_stop
+    _portfolio_problem = problem
+    _portfolio_stop = stop_event
+
+def _build_generator(algorithm: str, constraints: TimetableConstraints, options: Dict):
+    """Instantiate a generator from a portfolio strategy description"""
+    generator_classes = {
+        AlgorithmType.GREEDY.value: GreedyTimetableGenerator,
+        AlgorithmType.BACKTRACKING.value: BacktrackingTimetableGenerator,
+        AlgorithmType.CONSTRAINT_SATISFACTION.value: CSPTimetableGenerator,
+        AlgorithmType.LOCAL_SEARCH.value: LocalSearchTimetableGenerator,
+    }
+    return generator_classes[algorithm](constraints, **options)
+
+def _run_portfolio_strategy(name: str, algorithm: str, options: Dict) -> Tuple:
+    """Solve the worker's problem with one strategy; returns placements as plain ints"""
+    problem = _portfolio_problem
+    generator = _build_generator(algorithm, problem.constraints, options)
+    generator.should_stop = _portfolio_stop.is_set
+    schedule = generator.solve(problem)
+    return name, schedule.order, schedule.assignment, schedule.scores, generator.stats
+
+class PortfolioTimetableGenerator:
+    """Runs several strategies in parallel worker processes and keeps the best schedule.
+    
+    Returns the first schedule that places every course, or the best one available
+    when ``deadline`` seconds have passed; the remaining strategies are then
+    cancelled through their should_stop callbacks.
+    """
+    
+    def __init__(self, constraints: TimetableConstraints, 
+                 strategies: Optional[List[Tuple[str, str, Dict]]] = None,
+                 max_workers: Optional[int] = None, deadline: float = 10.0,
+                 first_complete: bool = True):
+        self.constraints = constraints
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.deadline = deadline
+        self.first_complete = first_complete
+        self.strategies = strategies or self.default_strategies(self.max_workers, deadline)
+        self.stats = SearchStats()
+        self.should_stop: Optional[Callable[[], bool]] = None
+        self.on_progress: Optional[Callable[[Dict], None]] = None
+    
+    @staticmethod
+    def default_strategies(workers: int, deadline: float) -> List[Tuple[str, str, Dict]]:
+        """(name, algorithm, options) triples: deterministic variants plus seeded restarts"""
+        strategies = [
+            ("greedy", "greedy", {}),
+            ("greedy-most-constrained", "greedy", {"ordering": "most_constrained"}),
+            ("greedy-dsatur", "greedy", {"ordering": "dsatur"}),
+            ("csp-lcv", "constraint_satisfaction", {}),
+            ("csp-preference", "constraint_satisfaction", {"value_order": "preference"}),
+            ("local-search", "local_search", {"time_budget": deadline}),
+        ]
+        seed = 1
+        while len(strategies) < max(workers, 8):
+            strategies.append((f"greedy-random-{seed}", "greedy", {"ordering": "random", "seed": seed}))
+            strategies.append((f"csp-random-{seed}", "constraint_satisfaction", 
+                               {"value_order": "random", "seed": seed}))
+            strategies.append((f"local-search-{seed}", "local_search", 
+                               {"time_budget": deadline, "seed": seed}))
+            seed += 1
+        return strategies
+    
+    def generate(self, courses: List[Course], faculty: List[Faculty], 
+                rooms: List[Room], time_slots: List[TimeSlot]) -> List[TimetableEntry]:
+        """Generate timetable with a parallel portfolio of strategies"""
+        problem = CompiledProblem(courses, faculty, rooms, time_slots, self.constraints)
+        return self.solve(problem).entries
+    
+    def solve(self, problem: CompiledProblem) -> BitsetOccupancy:
+        """Race the strategies on a compiled problem"""
+        self.stats = SearchStats()
+        context = multiprocessing.get_context()
+        stop_event = context.Event()
+        deadline = time.monotonic() + self.deadline
+        best = None
+        best_key = None
         
-        for course_id, domain in domains.items():
-            if course_id not in assignment and course_id != assigned_course_id:
-                old_domains[course_id] = domain.copy()
-                domains[course_id] = [entry for entry in domain 
-                                    if self._consistent(assigned_entry, entry, {}, {})]
+        executor = ProcessPoolExecutor(max_workers=min(self.max_workers, len(self.strategies)), 
+                                       mp_context=context, initializer=_init_portfolio_worker, 
+                                       initargs=(problem, stop_event))
+        pending = {executor.submit(_run_portfolio_strategy, *strategy) for strategy in self.strategies}
+        try:
+            while pending:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0 or (self.should_stop is not None and self.should_stop()):
+                    break
+                done, pending = wait(pending, timeout=min(timeout, 0.1), return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future.exception() is not None:
+                        continue  # a failing strategy does not sink the portfolio
+                    name, order, assignment, scores, stats = future.result()
+                    self.stats.merge(stats)
+                    schedule = BitsetOccupancy(problem)
+                    for c in order:
+                        schedule.place(c, assignment[c], scores[c])
+                    key = (len(order), IncrementalScorer.from_occupancy(schedule).total)
+                    if best_key is None or key > best_key:
+                        best, best_key = schedule, key
+                        self.stats.strategy = name
+                        _report_progress(self.on_progress, key[0], problem.n_courses, self.stats.nodes, 
+                                         key[1] / key[0] if key[0] else None)
+                if self.first_complete and best_key is not None and best_key[0] == problem.n_courses:
+                    break
+        finally:
+            # Ask running strategies to stop and drop queued ones, without waiting for
+            # the workers to wind down: the answer does not depend on them any more
+            stop_event.set()
+            executor.shutdown(wait=False, cancel_futures=True)
         
-        return old_domains
+        self.stats.interrupted = self.stats.interrupted or bool(pending)
+        return best if best is not None else BitsetOccupancy(problem)
+
+# Stop flag of decomposed-solve workers; installed once per worker by the pool initializer
+_component_stop = None
+
+def _init_component_worker(stop_event):
+    global _component_stop
+    _component_stop = stop_event
+
+def _solve_component(generator, problem: CompiledProblem) -> Tuple:
+    """Solve one component in a worker process; returns placements as plain ints"""
+    if _component_stop is not None:
+        generator.should_stop = _component_stop.is_set
+    schedule = generator.solve(problem)
+    return schedule.order, schedule.assignment, schedule.scores, generator.stats
+
+class DecomposedTimetableGenerator:
+    """Splits a problem into independent components and solves each with another generator.
+    
+    Components come from ``CompiledProblem.components``; coupled courses stay in
+    one component and are solved jointly. Component schedules cannot conflict, so
+    they are merged as they are, which also means a component the wrapped
+    generator cannot place does not discard the schedules of the others. With
+    ``max_workers`` above one, components are solved in worker processes, which
+    ``should_stop`` reaches through a shared event as in the portfolio.
+    
+    A wrapped generator with a time budget (local search's ``time_budget``, the
+    portfolio's ``deadline``) gets a share of it per component, proportional to
+    the component's size, so decomposing does not multiply the wall time.
+    """
+    
+    BUDGET_ATTRIBUTES = ("time_budget", "deadline")
+    
+    def __init__(self, generator, max_workers: int = 1):
+        self.generator = generator
+        self.constraints = generator.constraints
+        self.max_workers = max_workers
+        self.stats = SearchStats()
+        self.should_stop: Optional[Callable[[], bool]] = None
+        self.on_progress: Optional[Callable[[Dict], None]] = None
+    
+    def generate(self, courses: List[Course], faculty: List[Faculty], 
+                rooms: List[Room], time_slots: List[TimeSlot]) -> List[TimetableEntry]:
+        """Generate timetable one independent component at a time"""
+        problem = CompiledProblem(courses, faculty, rooms, time_slots, self.constraints)
+        return self.solve(problem).entries
+    
+    def solve(self, problem: CompiledProblem) -> BitsetOccupancy:
+        """Solve the components of a compiled problem and merge their schedules"""
+        self.stats = SearchStats()
+        components = problem.components()
+        if len(components) <= 1:
+            self.generator.should_stop = self.should_stop
+            self.generator.on_progress = self.on_progress
+            schedule = self.generator.solve(problem)
+            self.stats = self.generator.stats
+            return schedule
+        
+        # Largest components first, so the slowest solves start earliest
+        components.sort(key=len, reverse=True)
+        subproblems = [problem.subproblem(component) for component in components]
+        budget_attribute = next((name for name in self.BUDGET_ATTRIBUTES 
+                                 if isinstance(getattr(self.generator, name, None), (int, float))), None)
+        total_budget = getattr(self.generator, budget_attribute) if budget_attribute else None
+        
+        if self.max_workers > 1:
+            workers = min(self.max_workers, len(subproblems))
+            generators = []
+            for subproblem in subproblems:
+                generator = copy.copy(self.generator)
+                # Callbacks do not cross process boundaries
+                generator.should_stop = None
+                generator.on_progress = None
+                if total_budget is not None:
+                    # Components share the workers, so each gets its share of every worker's budget
+                    setattr(generator, budget_attribute, 
+                            min(total_budget, total_budget * workers * subproblem.n_courses / problem.n_courses))
+                generators.append(generator)
+            context = multiprocessing.get_context()
+            stop_event = context.Event()
+            placed = nodes = 0
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context, 
+                                     initializer=_init_component_worker, initargs=(stop_event,)) as executor:
+                futures = [executor.submit(_solve_component, generator, subproblem) 
+                           for generator, subproblem in zip(generators, subproblems)]
+                pending = set(futures)
+                try:
+                    while pending:
+                        if (not stop_event.is_set() and self.should_stop is not None and 
+                                self.should_stop()):
+                            # Running components return what they have placed; queued ones are dropped
+                            self.stats.interrupted = True
+                            stop_event.set()
+                            for future in pending:
+                                future.cancel()
+                        done, pending = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            if not future.cancelled():
+                                order, _, _, stats = future.result()
+                                placed += len(order)
+                                nodes += stats.nodes
+                                _report_progress(self.on_progress, placed, problem.n_courses, nodes)
+                finally:
+                    stop_event.set()
+                    for future in pending:
+                        future.cancel()
+            results = [None if future.cancelled() else future.result() for future in futures]
+        else:
+            self.generator.should_stop = self.should_stop
+            self.generator.on_progress = None  # progress is reported per component instead
+            deadline = time.monotonic() + total_budget if total_budget is not None else None
+            remaining = problem.n_courses
+            results = []
+            placed = 0
+            try:
+                for subproblem in subproblems:
+                    if self.should_stop is not None and self.should_stop():
+                        self.stats.interrupted = True
+                        break
+                    if deadline is not None:
+                        # Time left over by earlier components goes to the later ones
+                        share = max(0.0, deadline - time.monotonic()) * subproblem.n_courses / remaining
+                        setattr(self.generator, budget_attribute, share)
+                    remaining -= subproblem.n_courses
+                    schedule = self.generator.solve(subproblem)
+                    results.append((schedule.order, schedule.assignment, schedule.scores, 
+                                    self.generator.stats))
+                    placed += len(schedule)
+                    _report_progress(self.on_progress, placed, problem.n_courses, self.generator.stats.nodes)
+            finally:
+                if total_budget is not None:
+                    setattr(self.generator, budget_attribute, total_budget)
+        
+        merged = BitsetOccupancy(problem)
+        for component, result in zip(components, results):
+            if result is None:
+                continue  # cancelled before it started
+            order, assignment, scores, stats = result
+            for c in order:
+                merged.place(component[c], assignment[c], scores[c])
+            self.stats.merge(stats)
+        return merged
+
+# Name of the unchanged instance in compare_scenarios results
+BASE_SCENARIO = "base"
+
+def _schedule_row(entry: TimetableEntry) -> Dict:
+    """Schedule entry as it appears in a response payload"""
+    return {
+        "course_id": entry.course_id,
+        "faculty_id": entry.faculty_id,
+        "room_id": entry.room_id,
+        "time_slot_id": entry.time_slot_id,
+        "conflict_score": entry.conflict_score
+    }
+
+def _emit_chunks(rows: Iterator[Dict], on_entries: Callable[[List[Dict]], None], chunk_size: int):
+    """Pass rows to on_entries in lists of at most chunk_size, consuming the iterator"""
+    while True:
+        chunk = list(itertools.islice(rows, chunk_size))
+        if not chunk:
+            return
+        on_entries(chunk)
 
 class TimetableGenerator:
-    """Main timetable generator that orchestrates different algorithms"""
+    """Main timetable generator that orchestrates different algorithms.
     
-    def __init__(self):
+    ``cache`` is an optional ``timetable_cache.TimetableCache``; with one, identical
+    requests are answered from the cache and near-identical ones are warm-started
+    by repairing the closest cached schedule.
+    """
+    
+    def __init__(self, cache=None):
+        self.cache = cache
         self.constraints = TimetableConstraints()
         self.generators = {
             AlgorithmType.GREEDY: GreedyTimetableGenerator(self.constraints),
             AlgorithmType.BACKTRACKING: BacktrackingTimetableGenerator(self.constraints),
-            AlgorithmType.CONSTRAINT_SATISFACTION: CSPTimetableGenerator(self.constraints)
+            AlgorithmType.CONSTRAINT_SATISFACTION: CSPTimetableGenerator(self.constraints),
+            AlgorithmType.LOCAL_SEARCH: LocalSearchTimetableGenerator(self.constraints),
+            AlgorithmType.PORTFOLIO: PortfolioTimetableGenerator(self.constraints)
         }
     
     def generate_timetable(self, algorithm: AlgorithmType, courses: List[Course], 
                           faculty: List[Faculty], rooms: List[Room], 
-                          time_slots: List[TimeSlot]) -> Dict:
-        """Generate timetable using specified algorithm"""
+                          time_slots: List[TimeSlot], track_memory: bool = False,
+                          decompose: bool = False, max_workers: int = 1,
+                          on_progress: Optional[Callable[[Dict], None]] = None,
+                          should_stop: Optional[Callable[[], bool]] = None,
+                          profile_path: Optional[str] = None,
+                          student_courses: Optional[List[StudentCourse]] = None,
+                          on_entries: Optional[Callable[[List[Dict]], None]] = None,
+                          entries_chunk_size: int = 1000) -> Dict:
+        """Generate timetable using specified algorithm.
+        
+        ``student_courses`` are the enrollments; courses sharing a student are
+        never put in the same time slot. With ``decompose`` the courses are split into independent components that
+        are solved separately, in up to ``max_workers`` processes. ``on_progress``
+        receives periodic events with the number of courses placed and, for the
+        improving algorithms, the best score so far. Once ``should_stop`` returns
+        True the search winds down and returns what it has.
+        
+        The result's ``stats`` hold the search counters and per-phase times. With
+        ``profile_path`` the solve is also profiled and written there, as a
+        speedscope trace for ``.speedscope.json`` paths and as cProfile stats
+        otherwise; profiled runs bypass the cache.
+        
+        With ``on_entries`` the schedule rows are passed to it in lists of at most
+        ``entries_chunk_size`` as they are built from the solver state, and the
+        result's ``schedule`` is left empty.
+        """
+        
+        if self.cache is not None and not track_memory and profile_path is None:
+            result = self._generate_cached(algorithm, courses, faculty, rooms, time_slots, 
+                                           decompose, max_workers, on_progress, should_stop,
+                                           student_courses)
+            if on_entries is not None:
+                # The cache keeps the whole schedule anyway, so it is chunked from the result
+                _emit_chunks(iter(result["schedule"]), on_entries, entries_chunk_size)
+                result["schedule"] = []
+            return result
+        return self._generate(algorithm, courses, faculty, rooms, time_slots, 
+                              track_memory, decompose, max_workers, on_progress, should_stop,
+                              profile_path, student_courses, on_entries, entries_chunk_size)
+    
+    def _generate(self, algorithm: AlgorithmType, courses: List[Course], faculty: List[Faculty], 
+                  rooms: List[Room], time_slots: List[TimeSlot], track_memory: bool, 
+                  decompose: bool, max_workers: int, 
+                  on_progress: Optional[Callable[[Dict], None]] = None,
+                  should_stop: Optional[Callable[[], bool]] = None,
+                  profile_path: Optional[str] = None,
+                  student_courses: Optional[List[StudentCourse]] = None,
+                  on_entries: Optional[Callable[[List[Dict]], None]] = None,
+                  entries_chunk_size: int = 1000) -> Dict:
+        """Solve a request from scratch"""
         
         generator = self.generators[algorithm]
+        if decompose:
+            generator = DecomposedTimetableGenerator(generator, max_workers)
+        generator.on_progress = on_progress
+        generator.should_stop = should_stop
         
         try:
-            schedule = generator.generate(courses, faculty, rooms, time_slots)
+            if track_memory:
+                tracemalloc.start()
+            try:
+                compile_start = time.perf_counter()
+                problem = CompiledProblem(courses, faculty, rooms, time_slots, self.constraints, 
+                                          student_courses)
+                compile_seconds = time.perf_counter() - compile_start
+                solve_start = time.perf_counter()
+                if profile_path is not None:
+                    from timetable_profiling import profile_call
+                    occupancy = profile_call(profile_path, generator.solve, problem)
+                else:
+                    occupancy = generator.solve(problem)
+                solve_seconds = time.perf_counter() - solve_start
+            finally:
+                generator.on_progress = None
+                generator.should_stop = None
+                if track_memory:
+                    generator.stats.peak_memory_bytes = tracemalloc.get_traced_memory()[1]
+                    tracemalloc.stop()
             
-            # Calculate metrics
-            metrics = self._calculate_metrics(schedule, courses, faculty)
+            # The generators reset their stats at the start of solve, so the
+            # phases around it are recorded afterwards
+            stats = generator.stats
+            stats.phases["compile"] = compile_seconds
+            stats.phases["solve"] = solve_seconds
+            return self._result(algorithm, occupancy, len(courses), stats, on_entries, entries_chunk_size)
+        
+        except Exception as e:
+            return self._failure(algorithm, e, len(courses))
+    
+    def _generate_cached(self, algorithm: AlgorithmType, courses: List[Course], 
+                         faculty: List[Faculty], rooms: List[Room], time_slots: List[TimeSlot],
+                         decompose: bool, max_workers: int, 
+                         on_progress: Optional[Callable[[Dict], None]] = None,
+                         should_stop: Optional[Callable[[], bool]] = None,
+                         student_courses: Optional[List[StudentCourse]] = None) -> Dict:
+        """generate_timetable through the cache: exact hit, warm start, or full solve"""
+        inputs = self.cache.canonical_inputs(algorithm.value, courses, faculty, rooms, time_slots, 
+                                             student_courses)
+        key = self.cache.fingerprint(inputs)
+        cached = self.cache.get(key)
+        if cached is not None:
+            cached["cache"] = "hit"
+            cached["stats"] = SearchStats(cache_hits=1).as_dict()  # no search ran for this request
+            return cached
+        
+        result = None
+        warm = self.cache.warm_start(inputs)
+        if warm is not None:
+            existing, changes, base_inputs = warm
+            # Warm starts only come from entries with the same enrollments
+            result = self.repair_timetable(existing, changes, *base_inputs, algorithm=algorithm, 
+                                           student_courses=student_courses, on_progress=on_progress,
+                                           should_stop=should_stop)
+            result.pop("repaired_courses", None)
+            result.pop("moved_entries", None)
+            result["cache"] = "warm"
+        if result is None or not result["success"] or result["scheduled_courses"] < len(courses):
+            # No warm start, or it left courses unscheduled: solve from scratch and keep the better one
+            full = self._generate(algorithm, courses, faculty, rooms, time_slots, 
+                                  False, decompose, max_workers, on_progress, should_stop,
+                                  student_courses=student_courses)
+            full["cache"] = "miss"
+            if result is None or full["scheduled_courses"] >= result["scheduled_courses"]:
+                result = full
+        
+        if result["success"] and not result["stats"]["interrupted"]:
+            self.cache.put(key, inputs, result)
+        return result
+    
+    def repair_timetable(self, existing_schedule: List[TimetableEntry], changes: TimetableChanges,
+                         courses: List[Course], faculty: List[Faculty], rooms: List[Room], 
+                         time_slots: List[TimeSlot], 
+                         algorithm: AlgorithmType = AlgorithmType.CONSTRAINT_SATISFACTION,
+                         neighborhood: int = 8, max_rounds: int = 3,
+                         student_courses: Optional[List[StudentCourse]] = None,
+                         time_limit: Optional[float] = 1.0,
+                         on_progress: Optional[Callable[[Dict], None]] = None,
+                         should_stop: Optional[Callable[[], bool]] = None) -> Dict:
+        """Re-solve only the part of an existing timetable that ``changes`` invalidate.
+        
+        Entries that are still valid under the edited inputs stay pinned. The
+        invalidated courses (and new ones) are re-solved with ``algorithm`` around
+        the pinned placements; when that cannot place all of them, up to
+        ``neighborhood`` pinned neighbors of the unplaced courses are released and
+        the subproblem is solved again, for at most ``max_rounds`` extra rounds.
+        A released neighbor the re-solve does not place keeps its old placement,
+        and the best round is returned, so a repair never schedules fewer courses
+        than remain pinned. The rounds stop after ``time_limit`` seconds or once
+        ``should_stop`` returns True; ``on_progress`` gets one event per round.
+        """
+        
+        courses, faculty, rooms, time_slots = changes.apply(courses, faculty, rooms, time_slots)
+        generator = self.generators[algorithm]
+        deadline = time.monotonic() + time_limit if time_limit is not None else None
+        
+        def stop() -> bool:
+            return ((should_stop is not None and should_stop()) or 
+                    (deadline is not None and time.monotonic() > deadline))
+        
+        generator.should_stop = stop
+        try:
+            problem = CompiledProblem(courses, faculty, rooms, time_slots, self.constraints, 
+                                      student_courses)
+            pinned = self._pin_entries(problem, existing_schedule)
+            released = [c for c in range(problem.n_courses) if pinned[c] is None]
+            freed: Set[int] = set()  # pinned neighbors released in later rounds
+            stats = SearchStats()
+            best, best_key = None, None
+            
+            for round_idx in range(max_rounds + 1):
+                occupancy = BitsetOccupancy(problem)
+                for c, placement in enumerate(pinned):
+                    if placement is not None and c not in freed:
+                        occupancy.place(c, *placement)
+                
+                sub = problem.subproblem(released, [occupancy.free_values(c) for c in released])
+                sub_schedule = generator.solve(sub)
+                stats.merge(generator.stats)
+                for c in sub_schedule.order:
+                    occupancy.place(released[c], sub_schedule.assignment[c], sub_schedule.scores[c])
+                # Neighbors only move when the re-solve places them elsewhere
+                for c in freed:
+                    if occupancy.assignment[c] < 0 and occupancy.is_free(c, pinned[c][0]):
+                        occupancy.place(c, *pinned[c])
+                
+                key = (len(occupancy), IncrementalScorer.from_occupancy(occupancy).total)
+                if best_key is None or key > best_key:
+                    best, best_key = occupancy, key
+                _report_progress(on_progress, key[0], problem.n_courses, stats.nodes)
+                
+                unplaced = [c for c in released if occupancy.assignment[c] < 0]
+                if not unplaced or round_idx == max_rounds or stop():
+                    break
+                
+                # Release a bounded neighborhood of pinned courses around the failures
+                candidates = 0
+                for c in unplaced:
+                    candidates |= problem.neighbors[c]
+                neighbors = [c for c in _iter_bits(candidates) 
+                             if pinned[c] is not None and c not in freed][:neighborhood]
+                if not neighbors:
+                    break
+                freed.update(neighbors)
+                released = sorted(released + neighbors)
             
-            return {
-                "success": True,
-                "algorithm": algorithm.value,
-                "schedule": [
-                    {
-                        "course_id": entry.course_id,
-                        "faculty_id": entry.faculty_id,
-                        "room_id": entry.room_id,
-                        "time_slot_id": entry.time_slot_id,
-                        "conflict_score": entry.conflict_score
-                    }
-                    for entry in schedule
-                ],
-                "metrics": metrics,
-                "total_courses": len(courses),
-                "scheduled_courses": len(schedule),
-                "success_rate": len(schedule) / len(courses) if courses else 0
-            }
+            result = self._result(algorithm, best, len(courses), stats)
+            result["repaired_courses"] = len(released)
+            placed = {(e["course_id"], e["room_id"], e["time_slot_id"]) for e in result["schedule"]}
+            result["moved_entries"] = sum(1 for e in existing_schedule 
+                                          if (e.course_id, e.room_id, e.time_slot_id) not in placed)
+            return result
         
         except Exception as e:
-            return {
-                "success": False,
-                "algorithm": algorithm.value,
-                "error": str(e),
-                "schedule": [],
-                "metrics": {},
-                "total_courses": len(courses),
-                "scheduled_courses": 0,
-                "success_rate": 0
-            }
-    
-    def _calculate_metrics(self, schedule: List[TimetableEntry], 
-                          courses: List[Course], faculty: List[Faculty]) -> Dict:
-        """Calculate timetable quality metrics"""
-        
-        if not schedule:
+            return self._failure(algorithm, e, len(courses))
+        finally:
+            generator.should_stop = None
+    
+    def compare_scenarios(self, algorithm: AlgorithmType, courses: List[Course], 
+                          faculty: List[Faculty], rooms: List[Room], time_slots: List[TimeSlot],
+                          scenarios: Dict[str, TimetableChanges],
+                          student_courses: Optional[List[StudentCourse]] = None,
+                          max_workers: int = 1) -> Dict:
+        """Solve what-if variants of one instance and compare them side by side.
+        
+        Each scenario is a set of changes to the base inputs, e.g. removed rooms
+        or time slots. The base instance is compiled once and every variant is
+        compiled against it, so faculty, room and enrollment data the changes do
+        not touch is reused. The base and the variants are solved in up to
+        ``max_workers`` processes. Returns every result under ``scenarios`` and
+        a ``comparison`` table of their metrics with deltas against the base.
+        """
+        
+        generator = self.generators[algorithm]
+        named = {BASE_SCENARIO: TimetableChanges(), **scenarios}
+        problems: Dict[str, CompiledProblem] = {}
+        results: Dict[str, Dict] = {}
+        compile_seconds: Dict[str, float] = {}
+        base = None
+        for name, changes in named.items():
+            variant = changes.apply(courses, faculty, rooms, time_slots)
+            try:
+                start = time.perf_counter()
+                problems[name] = CompiledProblem(*variant, self.constraints, student_courses, base=base)
+                compile_seconds[name] = time.perf_counter() - start
+            except Exception as e:
+                results[name] = self._failure(algorithm, e, len(variant[0]))
+                continue
+            if base is None:
+                base = problems[name]
+        
+        outcomes: Dict[str, Tuple] = {}
+        if max_workers > 1 and len(problems) > 1:
+            with ProcessPoolExecutor(max_workers=min(max_workers, len(problems))) as executor:
+                futures = {name: executor.submit(_solve_component, generator, problem) 
+                           for name, problem in problems.items()}
+                for name, future in futures.items():
+                    try:
+                        outcomes[name] = future.result()
+                    except Exception as e:
+                        results[name] = self._failure(algorithm, e, problems[name].n_courses)
+        else:
+            for name, problem in problems.items():
+                try:
+                    outcomes[name] = _solve_component(generator, problem)
+                except Exception as e:
+                    results[name] = self._failure(algorithm, e, problems[name].n_courses)
+        
+        for name, (order, assignment, scores, stats) in outcomes.items():
+            problem = problems[name]
+            occupancy = BitsetOccupancy(problem)
+            for c in order:
+                occupancy.place(c, assignment[c], scores[c])
+            stats.phases["compile"] = compile_seconds[name]
+            results[name] = self._result(algorithm, occupancy, problem.n_courses, stats)
+        
+        ordered = {name: results[name] for name in named}
+        return {
+            "algorithm": algorithm.value,
+            "scenarios": ordered,
+            "comparison": [self._scenario_row(name, result, ordered[BASE_SCENARIO]) 
+                           for name, result in ordered.items()],
+        }
+    
+    def _scenario_row(self, name: str, result: Dict, base: Dict) -> Dict:
+        """Headline metrics of one scenario, with deltas against the base result"""
+        metrics = result["metrics"] or {}
+        base_metrics = base["metrics"] or {}
+        score = metrics.get("overall_score")
+        base_score = base_metrics.get("overall_score")
+        return {
+            "scenario": name,
+            "success": result["success"],
+            "scheduled_courses": result["scheduled_courses"],
+            "total_courses": result["total_courses"],
+            "success_rate": result["success_rate"],
+            "overall_score": score,
+            "workload_variance": metrics.get("faculty_workload", {}).get("workload_variance"),
+            "rooms_used": metrics.get("room_utilization", {}).get("total_rooms_used"),
+            "slots_used": metrics.get("time_distribution", {}).get("total_slots_used"),
+            "success_rate_delta": result["success_rate"] - base["success_rate"],
+            "score_delta": score - base_score if score is not None and base_score is not None else None,
+        }
+    
+    def _pin_entries(self, problem: CompiledProblem, 
+                     existing_schedule: List[TimetableEntry]) -> List[Optional[Tuple[int, float]]]:
+        """(value, conflict score) per course for existing entries that remain valid, else None"""
+        pinned: List[Optional[Tuple[int, float]]] = [None] * problem.n_courses
+        occupancy = BitsetOccupancy(problem)
+        for entry in existing_schedule:
+            c = problem.course_index.get(entry.course_id)
+            r = problem.room_index.get(entry.room_id)
+            s = problem.slot_index.get(entry.time_slot_id)
+            if c is None or r is None or s is None or pinned[c] is not None:
+                continue
+            if problem.courses[c].faculty_id != entry.faculty_id:
+                continue  # course was handed to another faculty member
+            value = r * problem.n_slots + s
+            if problem.unary_masks[c] >> value & 1 and occupancy.is_free(c, value):
+                occupancy.place(c, value)
+                pinned[c] = (value, entry.conflict_score)
+        return pinned
+    
+    def _result(self, algorithm: AlgorithmType, occupancy: BitsetOccupancy, total_courses: int, 
+                stats: SearchStats, on_entries: Optional[Callable[[List[Dict]], None]] = None,
+                entries_chunk_size: int = 1000) -> Dict:
+        """Response payload of a successful run; with ``on_entries`` the schedule is streamed to it"""
+        
+        # Calculate metrics; each entry's conflict score is rewritten to its scorer
+        # delta in placement order, so the entries add up to the total behind
+        # overall_score whichever generator placed them (the searches place with 0.0)
+        with stats.phase("metrics"):
+            scorer = IncrementalScorer(occupancy.problem)
+            for c in occupancy.order:
+                occupancy.scores[c] = scorer.assign(c, occupancy.assignment[c])
+            metrics = self._calculate_metrics(scorer)
+        
+        rows = (_schedule_row(entry) for entry in occupancy.iter_entries())
+        if on_entries is not None:
+            _emit_chunks(rows, on_entries, entries_chunk_size)
+        scheduled = len(occupancy)
+        return {
+            "success": True,
+            "algorithm": algorithm.value,
+            "schedule": list(rows),
+            "metrics": metrics,
+            "total_courses": total_courses,
+            "scheduled_courses": scheduled,
+            "success_rate": scheduled / total_courses if total_courses else 0,
+            "stats": stats.as_dict()
+        }
+    
+    def _failure(self, algorithm: AlgorithmType, error: Exception, total_courses: int) -> Dict:
+        """Response payload of a run that raised; same keys as ``_result`` plus ``error``"""
+        return {
+            "success": False,
+            "algorithm": algorithm.value,
+            "error": str(error),
+            "schedule": [],
+            "metrics": {},
+            "total_courses": total_courses,
+            "scheduled_courses": 0,
+            "success_rate": 0,
+            "stats": SearchStats().as_dict()
+        }
+    
+    def _calculate_metrics(self, scorer: IncrementalScorer) -> Dict:
+        """Calculate timetable quality metrics from the scorer's aggregates"""
+        
+        if not scorer.scheduled:
             return {}
         
         # Faculty workload distribution
-        faculty_hours = {}
-        for entry in schedule:
-            faculty_hours[entry.faculty_id] = faculty_hours.get(entry.faculty_id, 0) + 1
+        faculty_hours = [hours for hours in scorer.faculty_hours if hours]
         
         # Room utilization
-        room_usage = {}
-        for entry in schedule:
-            room_usage[entry.room_id] = room_usage.get(entry.room_id, 0) + 1
+        room_usage = [usage for usage in scorer.room_usage if usage]
         
         # Time slot distribution
-        time_slot_usage = {}
-        for entry in schedule:
-            time_slot_usage[entry.time_slot_id] = time_slot_usage.get(entry.time_slot_id, 0) + 1
+        time_slot_usage = [usage for usage in scorer.slot_usage if usage]
         
         return {
             "faculty_workload": {
-                "average_hours": sum(faculty_hours.values()) / len(faculty_hours) if faculty_hours else 0,
-                "max_hours": max(faculty_hours.values()) if faculty_hours else 0,
-                "min_hours": min(faculty_hours.values()) if faculty_hours else 0,
-                "workload_variance": self._calculate_variance(list(faculty_hours.values()))
+                "average_hours": sum(faculty_hours) / len(faculty_hours) if faculty_hours else 0,
+                "max_hours": max(faculty_hours) if faculty_hours else 0,
+                "min_hours": min(faculty_hours) if faculty_hours else 0,
+                "workload_variance": self._calculate_variance(faculty_hours)
             },
             "room_utilization": {
                 "total_rooms_used": len(room_usage),
-                "average_usage": sum(room_usage.values()) / len(room_usage) if room_usage else 0,
-                "max_usage": max(room_usage.values()) if room_usage else 0
+                "average_usage": sum(room_usage) / len(room_usage) if room_usage else 0,
+                "max_usage": max(room_usage) if room_usage else 0
             },
             "time_distribution": {
                 "total_slots_used": len(time_slot_usage),
-                "average_classes_per_slot": sum(time_slot_usage.values()) / len(time_slot_usage) if time_slot_usage else 0
+                "average_classes_per_slot": sum(time_slot_usage) / len(time_slot_usage) if time_slot_usage else 0
             },
-            "overall_score": sum(entry.conflict_score for entry in schedule) / len(schedule) if schedule else 0
+            "overall_score": scorer.total / scorer.scheduled
         }
     
     def _calculate_variance(self, values: List[float]) -> float:
@@ -0,0 +1,214 @@
+"""
+Audit of stored timetables
+Loads schedules into columnar integer arrays and computes hard-constraint violations and metrics in one pass
+"""
+
+import argparse
+import json
+import sys
+from array import array
+from typing import Dict, List, Optional
+
+from timetable_algorithms import (CompiledProblem, Course, Faculty, Room, StudentCourse, TimeSlot,
+                                  TimetableConstraints)
+
+VIOLATION_TYPES = ("unknown_reference", "room_double_booking", "faculty_double_booking",
+                   "student_clash", "capacity", "room_type", "availability")
+
+def _variance(values: List[int]) -> float:
+    if not values:
+        return 0
+    mean = sum(values) / len(values)
+    return sum((x - mean) ** 2 for x in values) / len(values)
+
+def _field(entry, name: str):
+    """Read a field from a TimetableEntry or from a stored row (dict)"""
+    return entry[name] if isinstance(entry, dict) else getattr(entry, name)
+
+class TimetableColumns:
+    """A schedule as parallel index arrays over a CompiledProblem's encoding; -1 marks an unknown id"""
+    
+    def __init__(self, problem: CompiledProblem, entries: List):
+        self.entries = entries
+        self.course = array("i")
+        self.faculty = array("i")
+        self.room = array("i")
+        self.slot = array("i")
+        course_index, faculty_index = problem.course_index, problem.faculty_index
+        room_index, slot_index = problem.room_index, problem.slot_index
+        for entry in entries:
+            self.course.append(course_index.get(_field(entry, "course_id"), -1))
+            self.faculty.append(faculty_index.get(_field(entry, "faculty_id"), -1))
+            self.room.append(room_index.get(_field(entry, "room_id"), -1))
+            self.slot.append(slot_index.get(_field(entry, "time_slot_id"), -1))
+    
+    def __len__(self) -> int:
+        return len(self.course)
+
+class TimetableAuditor:
+    """Audits any number of timetables against one set of inputs.
+    
+    The inputs are compiled once (indices, room and availability bitsets,
+    enrollment bitsets), so auditing every timetable of an institution costs one
+    compile plus a linear pass per timetable. Counts are accumulated in flat
+    arrays indexed by (room, slot), (faculty, slot), faculty, room and slot,
+    bincount style, instead of dictionaries keyed by id strings.
+    """
+    
+    def __init__(self, courses: List[Course], faculty: List[Faculty], rooms: List[Room],
+                 time_slots: List[TimeSlot], student_courses: Optional[List[StudentCourse]] = None,
+                 constraints: Optional[TimetableConstraints] = None):
+        self.problem = problem = CompiledProblem(courses, faculty, rooms, time_slots, constraints,
+                                                 student_courses)
+        # Per-record columns for the unary checks, reported separately unlike the combined masks
+        types: Dict[str, int] = {}
+        self.room_capacity = array("i", [r.capacity for r in problem.rooms])
+        self.room_type = array("i", [types.setdefault(r.room_type, len(types)) for r in problem.rooms])
+        self.course_capacity = array("i", [c.min_capacity for c in problem.courses])
+        # -1 accepts any room type
+        self.course_type = array("i", [-1 if c.required_room_type == "any" else
+                                       types.setdefault(c.required_room_type, len(types))
+                                       for c in problem.courses])
+        self.slot_day = array("i", [t.day_of_week for t in problem.time_slots])
+    
+    def audit_all(self, timetables: Dict[str, List]) -> Dict[str, Dict]:
+        """Audit report per timetable id"""
+        return {timetable_id: self.audit(entries) for timetable_id, entries in timetables.items()}
+    
+    def audit(self, entries: List) -> Dict:
+        """Violations and metrics of one schedule, given as TimetableEntry objects or stored rows"""
+        problem = self.problem
+        columns = TimetableColumns(problem, entries)
+        n_slots = problem.n_slots
+        n_faculty = len(problem.faculty)
+        
+        room_slot_first = array("i", [-1]) * problem.n_values
+        faculty_slot_first = array("i", [-1]) * (n_faculty * n_slots)
+        faculty_hours = array("i", [0]) * n_faculty
+        room_usage = array("i", [0]) * problem.n_rooms
+        slot_usage = array("i", [0]) * n_slots
+        slot_students = [0] * n_slots if problem.n_students else None
+        
+        violations: Dict[str, List[Dict]] = {kind: [] for kind in VIOLATION_TYPES}
+        # Double bookings are grouped per (room or faculty, slot) as they are found
+        room_bookings: Dict[int, Dict] = {}
+        faculty_bookings: Dict[int, Dict] = {}
+        
+        for i in range(len(columns)):
+            c, f, r, s = columns.course[i], columns.faculty[i], columns.room[i], columns.slot[i]
+            if c < 0 or f < 0 or r < 0 or s < 0:
+                violations["unknown_reference"].append(self._describe(i, entries))
+                continue
+            
+            faculty_hours[f] += 1
+            room_usage[r] += 1
+            slot_usage[s] += 1
+            
+            key = r * n_slots + s
+            first = room_slot_first[key]
+            if first < 0:
+                room_slot_first[key] = i
+            else:
+                booking = room_bookings.get(key)
+                if booking is None:
+                    booking = room_bookings[key] = {"room_id": problem.rooms[r].id,
+                                                    "time_slot_id": problem.time_slots[s].id,
+                                                    "course_ids": [problem.courses[columns.course[first]].id]}
+                    violations["room_double_booking"].append(booking)
+                booking["course_ids"].append(problem.courses[c].id)
+            
+            key = f * n_slots + s
+            first = faculty_slot_first[key]
+            if first < 0:
+                faculty_slot_first[key] = i
+            else:
+                booking = faculty_bookings.get(key)
+                if booking is None:
+                    booking = faculty_bookings[key] = {"faculty_id": problem.faculty[f].id,
+                                                       "time_slot_id": problem.time_slots[s].id,
+                                                       "course_ids": [problem.courses[columns.course[first]].id]}
+                    violations["faculty_double_booking"].append(booking)
+                booking["course_ids"].append(problem.courses[c].id)
+            
+            if slot_students is not None:
+                students = problem.enrollment[c]
+                shared = students & slot_students[s]
+                if shared:
+                    violations["student_clash"].append({**self._describe(i, entries),
+                                                        "students": shared.bit_count()})
+                slot_students[s] |= students
+            
+            if self.room_capacity[r] < self.course_capacity[c]:
+                violations["capacity"].append(self._describe(i, entries))
+            if self.course_type[c] >= 0 and self.course_type[c] != self.room_type[r]:
+                violations["room_type"].append(self._describe(i, entries))
+            if not problem.faculty_slot_bits[f] >> s & 1:
+                violations["availability"].append(self._describe(i, entries))
+        
+        counts = {kind: len(found) for kind, found in violations.items()}
+        return {
+            "entries": len(columns),
+            "valid": not any(counts.values()),
+            "violation_counts": counts,
+            "violations": violations,
+            "metrics": self._metrics(faculty_hours, room_usage, slot_usage),
+        }
+    
+    def _describe(self, i: int, entries: List) -> Dict:
+        entry = entries[i]
+        return {name: _field(entry, name) for name in ("course_id", "faculty_id", "room_id", "time_slot_id")}
+    
+    def _metrics(self, faculty_hours: array, room_usage: array, slot_usage: array) -> Dict:
+        """Same workload, room and slot figures as TimetableGenerator._calculate_metrics, plus days"""
+        hours = [h for h in faculty_hours if h]
+        rooms_used = [u for u in room_usage if u]
+        slots_used = [u for u in slot_usage if u]
+        days: Dict[int, int] = {}
+        for s, usage in enumerate(slot_usage):
+            if usage:
+                days[self.slot_day[s]] = days.get(self.slot_day[s], 0) + usage
+        return {
+            "faculty_workload": {
+                "average_hours": sum(hours) / len(hours) if hours else 0,
+                "max_hours": max(hours) if hours else 0,
+                "min_hours": min(hours) if hours else 0,
+                "workload_variance": _variance(hours)
+            },
+            "room_utilization": {
+                "total_rooms_used": len(rooms_used),
+                "average_usage": sum(rooms_used) / len(rooms_used) if rooms_used else 0,
+                "max_usage": max(rooms_used) if rooms_used else 0
+            },
+            "time_distribution": {
+                "total_slots_used": len(slots_used),
+                "average_classes_per_slot": sum(slots_used) / len(slots_used) if slots_used else 0
+            },
+            "day_distribution": {str(day): days[day] for day in sorted(days)},
+        }
+
+def audit_timetables(timetables: Dict[str, List], courses: List[Course], faculty: List[Faculty],
+                     rooms: List[Room], time_slots: List[TimeSlot],
+                     student_courses: Optional[List[StudentCourse]] = None) -> Dict[str, Dict]:
+    """Audit several timetables over the same inputs"""
+    return TimetableAuditor(courses, faculty, rooms, time_slots, student_courses).audit_all(timetables)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from timetable_service import _records
+    
+    parser = argparse.ArgumentParser(description="Audit stored timetables for conflicts")
+    parser.add_argument("input", help="JSON file with courses, faculty, rooms, time_slots, "
+                                      "student_courses and timetables (id -> entries)")
+    args = parser.parse_args(argv)
+    with open(args.input) as f:
+        data = json.load(f)
+    
+    reports = audit_timetables(data["timetables"], _records(Course, data.get("courses", [])),
+                               _records(Faculty, data.get("faculty", [])),
+                               _records(Room, data.get("rooms", [])),
+                               _records(TimeSlot, data.get("time_slots", [])),
+                               _records(StudentCourse, data.get("student_courses", [])))
+    print(json.dumps(reports, indent=2))
+    return 0 if all(report["valid"] for report in reports.values()) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
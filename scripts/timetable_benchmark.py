@@ -0,0 +1,239 @@
+"""
+Benchmark suite for the timetable generation algorithms
+Generates seeded synthetic instances and records time, memory, nodes and success rate per algorithm
+
+Usage:
+    python timetable_benchmark.py --sizes 50,200,1000 --seeds 3 --output results.json
+    python timetable_benchmark.py --sizes 50,200 --compare results.json
+"""
+
+import argparse
+import json
+import math
+import platform
+import random
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional, Tuple
+
+from timetable_algorithms import (AlgorithmType, Course, Faculty, Room, TimeSlot,
+                                  TimetableGenerator)
+
+DAYS = 5
+ROOM_CAPACITIES = (30, 40, 60, 90, 120)
+
+@dataclass
+class InstanceSpec:
+    """Parameters of a synthetic instance"""
+    courses: int = 200
+    periods_per_day: int = 8
+    faculty: Optional[int] = None  # defaults to one faculty member per 4 courses
+    rooms: Optional[int] = None  # defaults to what ``tightness`` implies
+    availability_density: float = 0.7  # share of slots each faculty member is available
+    lab_ratio: float = 0.25  # share of courses that need a laboratory
+    tightness: float = 0.6  # courses per room-slot when rooms are derived
+    departments: int = 4
+    seed: int = 0
+    
+    @property
+    def n_slots(self) -> int:
+        return DAYS * self.periods_per_day
+    
+    @property
+    def n_faculty(self) -> int:
+        return self.faculty or max(1, math.ceil(self.courses / 4))
+    
+    @property
+    def n_rooms(self) -> int:
+        return self.rooms or max(2, math.ceil(self.courses / (self.n_slots * self.tightness)))
+
+def generate_instance(spec: InstanceSpec) -> Tuple[List[Course], List[Faculty], List[Room], List[TimeSlot]]:
+    """Seeded instance with departments, lecture halls and labs, and partial faculty availability"""
+    rng = random.Random(spec.seed)
+    
+    time_slots = [
+        TimeSlot(f"ts{day}_{period}", day + 1, f"{8 + period:02d}:00", f"{9 + period:02d}:00",
+                 f"Period {period + 1}")
+        for day in range(DAYS) for period in range(spec.periods_per_day)
+    ]
+    
+    n_labs = min(spec.n_rooms - 1, max(1, round(spec.n_rooms * spec.lab_ratio))) if spec.lab_ratio > 0 else 0
+    rooms = []
+    for i in range(spec.n_rooms):
+        room_type = "laboratory" if i < n_labs else "lecture_hall"
+        capacity = rng.choice(ROOM_CAPACITIES[:3] if room_type == "laboratory" else ROOM_CAPACITIES)
+        rooms.append(Room(f"r{i}", f"R-{i:04d}", capacity, room_type, []))
+    
+    faculty = []
+    for i in range(spec.n_faculty):
+        available = [slot for slot in time_slots if rng.random() < spec.availability_density]
+        if not available:
+            available = [rng.choice(time_slots)]
+        faculty.append(Faculty(f"f{i}", f"Faculty {i}", f"d{i % spec.departments}",
+                               rng.randint(12, 24), [],
+                               {slot.id: rng.randint(1, 5) for slot in available}))
+    
+    max_capacity = {room_type: max((r.capacity for r in rooms if r.room_type == room_type), default=0)
+                    for room_type in ("laboratory", "lecture_hall")}
+    courses = []
+    for i in range(spec.courses):
+        practical = n_labs > 0 and rng.random() < spec.lab_ratio
+        room_type = "laboratory" if practical else "lecture_hall"
+        min_capacity = rng.choice([c for c in ROOM_CAPACITIES if c <= max_capacity[room_type]] or [0])
+        courses.append(Course(f"c{i}", f"C{i:05d}", f"Course {i}", rng.randint(1, 4),
+                              rng.randint(1, 8), "practical" if practical else "theory",
+                              f"f{rng.randrange(spec.n_faculty)}", room_type, min_capacity))
+    
+    return courses, faculty, rooms, time_slots
+
+def run_case(algorithm: AlgorithmType, spec: InstanceSpec, deadline: Optional[float],
+             track_memory: bool) -> Dict:
+    """Solve one instance with one algorithm and collect its measurements"""
+    courses, faculty, rooms, time_slots = generate_instance(spec)
+    stop_at = time.monotonic() + deadline if deadline is not None else None
+    should_stop = (lambda: time.monotonic() >= stop_at) if stop_at is not None else None
+    
+    start = time.perf_counter()
+    result = TimetableGenerator().generate_timetable(algorithm, courses, faculty, rooms, time_slots,
+                                                     track_memory=track_memory, should_stop=should_stop)
+    elapsed = time.perf_counter() - start
+    stats = result.get("stats", {})
+    return {
+        "algorithm": algorithm.value,
+        "courses": spec.courses,
+        "seed": spec.seed,
+        "seconds": elapsed,
+        "peak_memory_bytes": stats.get("peak_memory_bytes"),
+        "nodes": stats.get("nodes", 0),
+        "backtracks": stats.get("backtracks", 0),
+        "interrupted": stats.get("interrupted", False),
+        "success": result["success"],
+        "error": result.get("error"),
+        "success_rate": result["success_rate"],
+        "overall_score": result["metrics"].get("overall_score") if result["metrics"] else None,
+    }
+
+def run_benchmark(sizes: List[int], algorithms: List[AlgorithmType], seeds: int = 1,
+                  deadline: Optional[float] = 60.0, track_memory: bool = False,
+                  log=sys.stderr, **spec_options) -> Dict:
+    """Run every (size, algorithm, seed) case and return a machine-readable report"""
+    results = []
+    for size in sizes:
+        for algorithm in algorithms:
+            for seed in range(seeds):
+                spec = InstanceSpec(courses=size, seed=seed, **spec_options)
+                case = run_case(algorithm, spec, deadline, track_memory)
+                results.append(case)
+                if log is not None:
+                    print(f"{algorithm.value:>24} {size:>6} courses  seed {seed}  "
+                          f"{case['seconds']:8.3f}s  {case['nodes']:>9} nodes  "
+                          f"success {case['success_rate']:.2%}"
+                          f"{'  (interrupted)' if case['interrupted'] else ''}", file=log)
+    
+    return {
+        "version": _git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "deadline": deadline,
+        "spec": {k: v for k, v in asdict(InstanceSpec(**spec_options)).items()
+                 if k not in ("courses", "seed")},
+        "results": results,
+        "summary": summarize(results),
+    }
+
+def summarize(results: List[Dict]) -> List[Dict]:
+    """Per (algorithm, size) medians over seeds"""
+    groups: Dict[Tuple[str, int], List[Dict]] = {}
+    for case in results:
+        groups.setdefault((case["algorithm"], case["courses"]), []).append(case)
+    summary = []
+    for (algorithm, size), cases in groups.items():
+        summary.append({
+            "algorithm": algorithm,
+            "courses": size,
+            "median_seconds": _median([c["seconds"] for c in cases]),
+            "median_nodes": _median([c["nodes"] for c in cases]),
+            "mean_success_rate": sum(c["success_rate"] for c in cases) / len(cases),
+            "max_peak_memory_bytes": max((c["peak_memory_bytes"] or 0 for c in cases), default=0) or None,
+        })
+    return summary
+
+def compare(baseline: Dict, current: Dict, tolerance: float = 0.2) -> List[str]:
+    """Regressions of ``current`` against ``baseline``: slower beyond ``tolerance`` or less successful"""
+    previous = {(s["algorithm"], s["courses"]): s for s in baseline.get("summary", [])}
+    regressions = []
+    for entry in current["summary"]:
+        before = previous.get((entry["algorithm"], entry["courses"]))
+        if before is None:
+            continue
+        label = f"{entry['algorithm']} @ {entry['courses']} courses"
+        if entry["median_seconds"] > before["median_seconds"] * (1 + tolerance):
+            regressions.append(f"{label}: {before['median_seconds']:.3f}s -> {entry['median_seconds']:.3f}s")
+        if entry["mean_success_rate"] < before["mean_success_rate"]:
+            regressions.append(f"{label}: success {before['mean_success_rate']:.2%} -> "
+                               f"{entry['mean_success_rate']:.2%}")
+    return regressions
+
+def _median(values: List[float]) -> float:
+    ordered = sorted(values)
+    middle = len(ordered) // 2
+    return ordered[middle] if len(ordered) % 2 else (ordered[middle - 1] + ordered[middle]) / 2
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the timetable generation algorithms")
+    parser.add_argument("--sizes", default="50,200,1000",
+                        help="comma-separated course counts (default: 50,200,1000)")
+    parser.add_argument("--algorithms", default=",".join(a.value for a in AlgorithmType),
+                        help="comma-separated algorithm names (default: all)")
+    parser.add_argument("--seeds", type=int, default=1, help="instances per size")
+    parser.add_argument("--deadline", type=float, default=60.0,
+                        help="seconds before a run is asked to stop (0 disables)")
+    parser.add_argument("--memory", action="store_true", help="measure peak memory (slower)")
+    parser.add_argument("--periods-per-day", type=int, default=8)
+    parser.add_argument("--availability-density", type=float, default=0.7)
+    parser.add_argument("--lab-ratio", type=float, default=0.25)
+    parser.add_argument("--tightness", type=float, default=0.6)
+    parser.add_argument("--output", metavar="PATH", help="write the JSON report here instead of stdout")
+    parser.add_argument("--compare", metavar="PATH", help="baseline report to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed slowdown against the baseline (default: 0.2)")
+    args = parser.parse_args(argv)
+    
+    report = run_benchmark(
+        sizes=[int(size) for size in args.sizes.split(",")],
+        algorithms=[AlgorithmType(name) for name in args.algorithms.split(",")],
+        seeds=args.seeds,
+        deadline=args.deadline or None,
+        track_memory=args.memory,
+        periods_per_day=args.periods_per_day,
+        availability_density=args.availability_density,
+        lab_ratio=args.lab_ratio,
+        tightness=args.tightness,
+    )
+    
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+    
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(json.load(f), report, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,205 @@
+"""
+Persistent solve cache for the timetable generator
+Stores generate_timetable results in SQLite, keyed by a canonical fingerprint of the inputs
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional, Tuple
+
+from timetable_algorithms import (Course, Faculty, Room, StudentCourse, TimeSlot, TimetableChanges,
+                                  TimetableEntry)
+
+# Bump when the result format or the solvers change in a way that invalidates old entries
+CACHE_FORMAT_VERSION = 1
+
+def _canonical_records(records: List) -> List[Dict]:
+    """Records as dicts sorted by id, with unordered list fields sorted too"""
+    canonical = []
+    for record in sorted(records, key=lambda r: r.id):
+        data = asdict(record)
+        for name, value in data.items():
+            if isinstance(value, list):
+                data[name] = sorted(value)
+        canonical.append(data)
+    return canonical
+
+def canonical_inputs(algorithm: str, courses: List[Course], faculty: List[Faculty],
+                     rooms: List[Room], time_slots: List[TimeSlot],
+                     student_courses: Optional[List[StudentCourse]] = None) -> Dict:
+    """Order-independent description of a generation request"""
+    inputs = {
+        "version": CACHE_FORMAT_VERSION,
+        "algorithm": algorithm,
+        "courses": _canonical_records(courses),
+        "faculty": _canonical_records(faculty),
+        "rooms": _canonical_records(rooms),
+        "time_slots": _canonical_records(time_slots),
+    }
+    if student_courses:
+        # Only present with enrollments, so requests without them keep their keys
+        inputs["student_courses"] = sorted({(e.student_id, e.course_id) for e in student_courses})
+    return inputs
+
+def _digest(data) -> str:
+    encoded = json.dumps(data, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+def _diff_records(old: List[Dict], new: List[Dict]) -> Tuple[List[Dict], List[str]]:
+    """(changed or added records, removed ids) between two canonical record lists"""
+    old_by_id = {r["id"]: r for r in old}
+    new_ids = {r["id"] for r in new}
+    changed = [r for r in new if old_by_id.get(r["id"]) != r]
+    removed = [r_id for r_id in old_by_id if r_id not in new_ids]
+    return changed, removed
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    warm_starts: int = 0
+    stores: int = 0
+    evictions: int = 0
+
+class TimetableCache:
+    """Content-addressed, size-bounded LRU store of timetable results.
+    
+    Exact matches are looked up by the fingerprint of the canonical inputs.
+    Entries are also grouped by a family key (algorithm and time slot ids), so a
+    request that differs from a cached one in only a few records can be
+    warm-started by repairing the cached schedule.
+    """
+    
+    def __init__(self, path: str = "timetable_cache.sqlite3", max_bytes: int = 64 * 1024 * 1024,
+                 warm_start_ratio: float = 0.1):
+        self.path = path
+        self.max_bytes = max_bytes
+        # Largest share of changed records for which a warm start is attempted
+        self.warm_start_ratio = warm_start_ratio
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS solutions ("
+            " key TEXT PRIMARY KEY, family TEXT NOT NULL, inputs TEXT NOT NULL,"
+            " result TEXT NOT NULL, size INTEGER NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS solutions_family ON solutions (family, last_used)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS solutions_last_used ON solutions (last_used)")
+        self._db.commit()
+    
+    def canonical_inputs(self, algorithm: str, courses: List[Course], faculty: List[Faculty],
+                         rooms: List[Room], time_slots: List[TimeSlot],
+                         student_courses: Optional[List[StudentCourse]] = None) -> Dict:
+        return canonical_inputs(algorithm, courses, faculty, rooms, time_slots, student_courses)
+    
+    def fingerprint(self, inputs: Dict) -> str:
+        """Cache key of canonical inputs"""
+        return _digest(inputs)
+    
+    def family(self, inputs: Dict) -> str:
+        """Key shared by requests for the same algorithm over the same time slots and enrollments"""
+        key = [inputs["version"], inputs["algorithm"], [slot["id"] for slot in inputs["time_slots"]]]
+        if "student_courses" in inputs:
+            key.append(inputs["student_courses"])
+        return _digest(key)
+    
+    def get(self, key: str) -> Optional[Dict]:
+        """Cached result for a fingerprint, refreshing its LRU position"""
+        with self._lock:
+            row = self._db.execute("SELECT result FROM solutions WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.stats.misses += 1
+                return None
+            self._db.execute("UPDATE solutions SET last_used = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+            self.stats.hits += 1
+        return json.loads(row[0])
+    
+    def put(self, key: str, inputs: Dict, result: Dict):
+        """Store a result, then evict least recently used entries beyond ``max_bytes``"""
+        inputs_json = json.dumps(inputs, sort_keys=True, separators=(",", ":"))
+        result_json = json.dumps(result, separators=(",", ":"))
+        size = len(inputs_json) + len(result_json)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO solutions (key, family, inputs, result, size, last_used)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (key, self.family(inputs), inputs_json, result_json, size, time.time())
+            )
+            self.stats.stores += 1
+            self._evict()
+            self._db.commit()
+    
+    def _evict(self):
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM solutions").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._db.execute(
+                "SELECT key, size FROM solutions ORDER BY last_used").fetchall():
+            if total <= self.max_bytes:
+                break
+            self._db.execute("DELETE FROM solutions WHERE key = ?", (key,))
+            total -= size
+            self.stats.evictions += 1
+    
+    def warm_start(self, inputs: Dict) -> Optional[Tuple[List[TimetableEntry], TimetableChanges, Tuple]]:
+        """Closest cached solution of the same family, as repair_timetable arguments.
+        
+        Returns (existing schedule, changes, (courses, faculty, rooms, time_slots)
+        of the cached request), or None when no recent entry is close enough.
+        Incomplete schedules are skipped: repairing one would still end in a full
+        solve for the courses it could not place.
+        """
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT inputs, result FROM solutions WHERE family = ? ORDER BY last_used DESC LIMIT 8",
+                (self.family(inputs),)
+            ).fetchall()
+        
+        total = sum(len(inputs[kind]) for kind in ("courses", "faculty", "rooms", "time_slots"))
+        best = None
+        for inputs_json, result_json in rows:
+            result = json.loads(result_json)
+            if result["scheduled_courses"] < result["total_courses"]:
+                continue
+            cached = json.loads(inputs_json)
+            diffs = {kind: _diff_records(cached[kind], inputs[kind])
+                     for kind in ("courses", "faculty", "rooms", "time_slots")}
+            changed = sum(len(c) + len(r) for c, r in diffs.values())
+            if changed <= max(1, self.warm_start_ratio * total) and (best is None or changed < best[0]):
+                best = (changed, cached, result, diffs)
+        if best is None:
+            return None
+        
+        _, cached, result, diffs = best
+        record_types = {"courses": Course, "faculty": Faculty, "rooms": Room, "time_slots": TimeSlot}
+        changes = TimetableChanges(
+            **{kind: [record_types[kind](**r) for r in diffs[kind][0]] for kind in record_types},
+            **{f"removed_{kind}": diffs[kind][1] for kind in record_types}
+        )
+        base_inputs = tuple([record_types[kind](**r) for r in cached[kind]] for kind in record_types)
+        existing = [TimetableEntry(**entry) for entry in result["schedule"]]
+        self.stats.warm_starts += 1
+        return existing, changes, base_inputs
+    
+    def summary(self) -> Dict:
+        """Hit/miss counters together with the current size of the store"""
+        with self._lock:
+            entries, total = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM solutions").fetchone()
+        return {**asdict(self.stats), "entries": entries, "bytes": total}
+    
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM solutions")
+            self._db.commit()
+    
+    def close(self):
+        self._db.close()
@@ -0,0 +1,185 @@
+"""
+Streaming input for large timetabling jobs
+Parses the algorithmData JSON shape record by record straight into solver records
+"""
+
+import json
+from dataclasses import dataclass, field, fields
+from typing import Dict, Iterator, List, Optional, TextIO
+
+from timetable_algorithms import Course, Faculty, Room, StudentCourse, TimeSlot
+
+# Top-level arrays of algorithmData and the record each element becomes
+RECORD_TYPES = {
+    "courses": Course,
+    "faculty": Faculty,
+    "rooms": Room,
+    "time_slots": TimeSlot,
+    "student_courses": StudentCourse,
+}
+
+# String fields repeated across many records; equal values share one str object
+INTERNED_FIELDS = {
+    Course: ("id", "course_type", "faculty_id", "required_room_type"),
+    Faculty: ("id", "department_id"),
+    Room: ("id", "room_type"),
+    TimeSlot: ("id",),
+    StudentCourse: ("student_id", "course_id"),
+}
+
+@dataclass
+class TimetableJob:
+    """Records of one generation job, ready for TimetableGenerator.generate_timetable"""
+    algorithm: Optional[str] = None
+    courses: List[Course] = field(default_factory=list)
+    faculty: List[Faculty] = field(default_factory=list)
+    rooms: List[Room] = field(default_factory=list)
+    time_slots: List[TimeSlot] = field(default_factory=list)
+    student_courses: List[StudentCourse] = field(default_factory=list)
+    options: Dict = field(default_factory=dict)
+
+class _JsonReader:
+    """Incremental JSON tokenizer over a text stream that keeps only the unread tail in memory"""
+    
+    def __init__(self, stream: TextIO, chunk_size: int):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+    
+    def _fill(self) -> bool:
+        """Append the next chunk, dropping what has been consumed; False at end of input"""
+        if self.eof:
+            return False
+        chunk = self.stream.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+    
+    def peek(self) -> str:
+        """Next non-whitespace character, or "" at end of input"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ""
+    
+    def expect(self, char: str):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} but found {found or 'end of input'!r}")
+        self.pos += 1
+    
+    def value(self):
+        """Decode one complete JSON value, reading more input until it is whole"""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # A number ending at the buffer edge may continue in the next chunk
+            if end == len(self.buffer) and self._fill():
+                continue
+            self.pos = end
+            return value
+    
+    def items(self) -> Iterator:
+        """Elements of the JSON array starting at the current position"""
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.peek() == ",":
+                self.pos += 1
+                continue
+            self.expect("]")
+            return
+
+class _RecordBuilder:
+    """Turns JSON objects into solver records, interning repeated strings and checking ids"""
+    
+    def __init__(self):
+        self.strings: Dict[str, str] = {}
+        self.field_names = {record_type: {f.name for f in fields(record_type)}
+                            for record_type in RECORD_TYPES.values()}
+    
+    def intern(self, value):
+        return self.strings.setdefault(value, value) if isinstance(value, str) else value
+    
+    def build(self, key: str, index: int, item):
+        record_type = RECORD_TYPES[key]
+        if not isinstance(item, dict):
+            raise ValueError(f"{key}[{index}] is not an object")
+        names = self.field_names[record_type]
+        values = {k: v for k, v in item.items() if k in names}
+        for name in INTERNED_FIELDS[record_type]:
+            if name in values:
+                values[name] = self.intern(values[name])
+        if record_type is Faculty and isinstance(values.get("availability"), dict):
+            values["availability"] = {self.intern(k): v for k, v in values["availability"].items()}
+        try:
+            record = record_type(**values)
+        except TypeError as e:
+            raise ValueError(f"{key}[{index}]: {e}") from None
+        if record_type is not StudentCourse and not isinstance(record.id, str):
+            raise ValueError(f"{key}[{index}] has no string id")
+        return record
+
+def load_job(stream: TextIO, chunk_size: int = 1 << 16) -> TimetableJob:
+    """Read a generation job in the algorithmData shape built by timetable-api.ts.
+    
+    Array elements are decoded and converted one at a time, so peak memory is
+    the records themselves rather than the JSON text plus a parsed copy of it.
+    Duplicate ids are rejected; enrollments of unknown courses are dropped, as
+    the solver would ignore them anyway.
+    """
+    reader = _JsonReader(stream, chunk_size)
+    builder = _RecordBuilder()
+    job = TimetableJob()
+    
+    reader.expect("{")
+    if reader.peek() == "}":
+        reader.pos += 1
+        return job
+    while True:
+        key = reader.value()
+        if not isinstance(key, str):
+            raise ValueError("Object keys must be strings")
+        reader.expect(":")
+        if key in RECORD_TYPES:
+            records = getattr(job, key)
+            for index, item in enumerate(reader.items()):
+                records.append(builder.build(key, index, item))
+        elif key == "algorithm":
+            job.algorithm = reader.value()
+        elif key == "options":
+            job.options = reader.value()
+        else:
+            reader.value()
+        if reader.peek() == ",":
+            reader.pos += 1
+            continue
+        reader.expect("}")
+        break
+    
+    for key in ("courses", "faculty", "rooms", "time_slots"):
+        seen = set()
+        for record in getattr(job, key):
+            if record.id in seen:
+                raise ValueError(f"Duplicate id in {key}: {record.id}")
+            seen.add(record.id)
+    course_ids = {c.id for c in job.courses}
+    job.student_courses = [e for e in job.student_courses if e.course_id in course_ids]
+    return job
@@ -0,0 +1,143 @@
+"""
+Asynchronous job manager for timetable generation
+Runs solves in a worker thread pool with deadlines, cooperative cancellation and per-institution limits
+"""
+
+import asyncio
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from timetable_algorithms import AlgorithmType, Course, Faculty, Room, TimeSlot, TimetableGenerator
+
+class CancellationToken:
+    """Thread-safe stop flag with an optional deadline, polled by the generators"""
+    
+    def __init__(self):
+        self._event = threading.Event()
+        self.deadline: Optional[float] = None  # time.monotonic() value
+    
+    def cancel(self):
+        self._event.set()
+    
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+    
+    def start_deadline(self, seconds: Optional[float]):
+        self.deadline = time.monotonic() + seconds if seconds is not None else None
+    
+    @property
+    def expired(self) -> bool:
+        return self.deadline is not None and time.monotonic() >= self.deadline
+    
+    def should_stop(self) -> bool:
+        """Generator should_stop callback: cancelled or out of time"""
+        return self._event.is_set() or self.expired
+
+@dataclass
+class Job:
+    id: str
+    institution_id: str
+    algorithm: AlgorithmType
+    deadline: Optional[float]
+    token: CancellationToken = field(default_factory=CancellationToken)
+    status: str = "queued"  # queued, running, done, cancelled, failed
+    progress: Optional[Dict] = None  # latest progress event of the solver
+    task: Optional[asyncio.Task] = None
+    
+    def cancel(self):
+        """Cancel a queued job, or ask a running solve to stop and keep its best-so-far result"""
+        self.token.cancel()
+        if self.status == "queued" and self.task is not None:
+            self.task.cancel()
+    
+    async def result(self) -> Dict:
+        return await self.task
+
+class JobManager:
+    """Runs generate_timetable jobs concurrently under global and per-institution limits.
+    
+    Solves run in a thread pool of ``max_workers``; each job gets its own
+    TimetableGenerator, since generators keep per-solve state. A job's deadline
+    starts when it begins running; when it passes (or the job is cancelled) the
+    generator stops at its next check and the anytime algorithms (greedy, local
+    search, portfolio) return their best schedule so far.
+    """
+    
+    def __init__(self, max_workers: int = 4, max_per_institution: int = 2,
+                 default_deadline: Optional[float] = None, cache=None):
+        self.max_per_institution = max_per_institution
+        self.default_deadline = default_deadline
+        self.cache = cache
+        self.jobs: Dict[str, Job] = {}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="timetable")
+        self._institution_slots: Dict[str, asyncio.Semaphore] = {}
+        self._ids = itertools.count(1)
+    
+    def submit(self, institution_id: str, algorithm: AlgorithmType, courses: List[Course],
+               faculty: List[Faculty], rooms: List[Room], time_slots: List[TimeSlot],
+               deadline: Optional[float] = None, **options) -> Job:
+        """Queue a job; must be called from the event loop that will run it"""
+        job = Job(id=f"job-{next(self._ids)}", institution_id=institution_id, algorithm=algorithm,
+                  deadline=deadline if deadline is not None else self.default_deadline)
+        job.task = asyncio.get_running_loop().create_task(
+            self._run(job, courses, faculty, rooms, time_slots, options))
+        self.jobs[job.id] = job
+        return job
+    
+    async def run(self, *args, **kwargs) -> Dict:
+        """Submit a job and wait for its result"""
+        return await self.submit(*args, **kwargs).result()
+    
+    def cancel(self, job_id: str) -> bool:
+        job = self.jobs.get(job_id)
+        if job is None or job.status not in ("queued", "running"):
+            return False
+        job.cancel()
+        return True
+    
+    async def _run(self, job: Job, courses, faculty, rooms, time_slots, options: Dict) -> Dict:
+        slots = self._institution_slots.setdefault(
+            job.institution_id, asyncio.Semaphore(self.max_per_institution))
+        try:
+            async with slots:
+                if job.token.cancelled:
+                    raise asyncio.CancelledError()
+                job.status = "running"
+                job.token.start_deadline(job.deadline)
+                loop = asyncio.get_running_loop()
+                result = await loop.run_in_executor(
+                    self._executor, self._solve, job, courses, faculty, rooms, time_slots, options)
+        except asyncio.CancelledError:
+            job.token.cancel()  # the worker thread cannot be interrupted, so stop its solve too
+            job.status = "cancelled"
+            raise
+        except Exception:
+            job.status = "failed"
+            raise
+        
+        if job.token.cancelled:
+            job.status = "cancelled"
+        else:
+            job.status = "done" if result["success"] else "failed"
+        return result
+    
+    def _solve(self, job: Job, courses, faculty, rooms, time_slots, options: Dict) -> Dict:
+        def on_progress(progress: Dict):
+            job.progress = progress
+        
+        generator = TimetableGenerator(cache=self.cache)
+        return generator.generate_timetable(job.algorithm, courses, faculty, rooms, time_slots,
+                                            on_progress=on_progress,
+                                            should_stop=job.token.should_stop, **options)
+    
+    def shutdown(self):
+        """Stop every job and release the worker threads"""
+        for job in self.jobs.values():
+            if job.status in ("queued", "running"):
+                job.cancel()
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,93 @@
+"""
+Profile export for the timetable generator
+Writes a call profile of a solve as cProfile stats or as a speedscope trace
+"""
+
+import cProfile
+import json
+import sys
+import time
+from typing import Callable, Dict, List, Tuple
+
+SPEEDSCOPE_SCHEMA = "https://www.speedscope.app/file-format-schema.json"
+
+class _EventRecorder:
+    """Records open/close events of Python and builtin calls for a speedscope evented profile"""
+    
+    def __init__(self):
+        self.frames: List[Dict] = []
+        self.frame_index: Dict[Tuple, int] = {}
+        self.events: List[Dict] = []
+        self.stack: List[int] = []
+        self.start = time.perf_counter()
+    
+    def _frame(self, key: Tuple, name: str, file: str, line: int) -> int:
+        index = self.frame_index.get(key)
+        if index is None:
+            index = self.frame_index[key] = len(self.frames)
+            self.frames.append({"name": name, "file": file, "line": line})
+        return index
+    
+    def __call__(self, frame, event: str, arg):
+        at = time.perf_counter() - self.start
+        if event == "call":
+            code = frame.f_code
+            key = (code.co_filename, code.co_firstlineno, code.co_name)
+            index = self._frame(key, code.co_name, code.co_filename, code.co_firstlineno)
+        elif event == "c_call":
+            name = getattr(arg, "__qualname__", None) or getattr(arg, "__name__", repr(arg))
+            index = self._frame(("builtin", name), name, "<builtin>", 0)
+        elif event in ("return", "c_return", "c_exception") and self.stack:
+            self.events.append({"type": "C", "frame": self.stack.pop(), "at": at})
+            return
+        else:
+            return
+        self.stack.append(index)
+        self.events.append({"type": "O", "frame": index, "at": at})
+    
+    def finish(self) -> float:
+        """Close frames still open when recording stopped; returns the end time"""
+        end = time.perf_counter() - self.start
+        while self.stack:
+            self.events.append({"type": "C", "frame": self.stack.pop(), "at": end})
+        return end
+    
+    def speedscope(self, name: str, end: float) -> Dict:
+        return {
+            "$schema": SPEEDSCOPE_SCHEMA,
+            "shared": {"frames": self.frames},
+            "profiles": [{
+                "type": "evented",
+                "name": name,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": end,
+                "events": self.events,
+            }],
+            "name": name,
+            "exporter": "timetable_profiling",
+        }
+
+def profile_call(path: str, func: Callable, *args, **kwargs):
+    """Call ``func`` under a profiler and write the profile to ``path``.
+    
+    Paths ending in ``.speedscope.json`` get an evented speedscope trace of
+    every call (slow, but it keeps call order and nesting); anything else gets
+    cProfile statistics readable with ``pstats`` or snakeviz.
+    """
+    if path.endswith(".speedscope.json"):
+        recorder = _EventRecorder()
+        sys.setprofile(recorder)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            sys.setprofile(None)
+            end = recorder.finish()
+            with open(path, "w") as f:
+                json.dump(recorder.speedscope(getattr(func, "__qualname__", "solve"), end), f)
+    
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(func, *args, **kwargs)
+    finally:
+        profiler.dump_stats(path)
@@ -0,0 +1,142 @@
+"""
+Long-running timetable solver service
+Reads generation jobs as JSON lines on stdin and streams progress events and results on stdout
+
+Requests:
+    {"id": "job-1", "type": "generate", "algorithm": "greedy", "courses": [...],
+     "faculty": [...], "rooms": [...], "time_slots": [...], "student_courses": [...],
+     "options": {...}}
+    {"id": "job-2", "type": "generate", "input_path": "/tmp/job-2.json", "options": {...}}
+    {"id": "p", "type": "ping"}
+    {"type": "shutdown"}
+
+Events (one JSON object per line, tagged with the request id):
+    {"id": "job-1", "event": "accepted"}
+    {"id": "job-1", "event": "progress", "placed": 10, "total": 40, "nodes": 64, "best_score": null}
+    {"id": "job-1", "event": "entries", "entries": [...]}
+    {"id": "job-1", "event": "result", "result": {...}}
+    {"id": "job-1", "event": "error", "error": "..."}
+    {"id": "p", "event": "pong"}
+
+A job with "input_path" reads its records from that file in the same shape as an
+inline job, parsed incrementally. With the "schedule_chunk_size" option the schedule
+is sent as "entries" events of at most that many rows, built from the solver state
+as they are sent, before the result, whose "schedule" is then empty.
+"""
+
+import argparse
+import json
+import sys
+import time
+from dataclasses import fields
+from typing import Callable, Dict, List, Optional, TextIO
+
+from timetable_algorithms import (AlgorithmType, Course, Faculty, Room, StudentCourse, TimeSlot,
+                                  TimetableGenerator)
+from timetable_io import load_job
+
+# generate_timetable keyword options a job may set
+JOB_OPTIONS = ("decompose", "max_workers")
+
+def _records(record_type, items: List[Dict]) -> List:
+    """Build dataclass records from JSON objects, ignoring fields the solver does not use;
+    records already built by the streaming loader pass through"""
+    names = {f.name for f in fields(record_type)}
+    return [item if isinstance(item, record_type) else
+            record_type(**{k: v for k, v in item.items() if k in names}) for item in items]
+
+class SolverService:
+    """Serves generation jobs one at a time from a single loaded TimetableGenerator"""
+    
+    def __init__(self, output: TextIO = sys.stdout, progress_interval: float = 0.25, cache=None):
+        self.output = output
+        self.progress_interval = progress_interval
+        self.generator = TimetableGenerator(cache=cache)
+    
+    def emit(self, job_id: Optional[str], event: str, **payload):
+        self.output.write(json.dumps({"id": job_id, "event": event, **payload}) + "\n")
+        self.output.flush()
+    
+    def serve(self, lines) -> None:
+        """Handle requests until shutdown or end of input"""
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                request = json.loads(line)
+            except json.JSONDecodeError as e:
+                self.emit(None, "error", error=f"Invalid JSON: {e}")
+                continue
+            
+            job_id = request.get("id")
+            request_type = request.get("type", "generate")
+            if request_type == "shutdown":
+                break
+            elif request_type == "ping":
+                self.emit(job_id, "pong")
+            elif request_type == "generate":
+                self.run_job(job_id, request)
+            else:
+                self.emit(job_id, "error", error=f"Unknown request type: {request_type}")
+    
+    def run_job(self, job_id: Optional[str], request: Dict):
+        try:
+            if "input_path" in request:
+                with open(request["input_path"]) as f:
+                    loaded = load_job(f)
+                request = {**vars(loaded), **{k: v for k, v in request.items() if k != "input_path"}}
+            algorithm = AlgorithmType(request["algorithm"])
+            courses = _records(Course, request.get("courses", []))
+            faculty = _records(Faculty, request.get("faculty", []))
+            rooms = _records(Room, request.get("rooms", []))
+            time_slots = _records(TimeSlot, request.get("time_slots", []))
+            student_courses = _records(StudentCourse, request.get("student_courses", []))
+        except (KeyError, TypeError, ValueError, OSError) as e:
+            self.emit(job_id, "error", error=f"Invalid job: {e}")
+            return
+        options = {k: v for k, v in request.get("options", {}).items() if k in JOB_OPTIONS}
+        chunk_size = request.get("options", {}).get("schedule_chunk_size")
+        if chunk_size:
+            options["on_entries"] = lambda entries: self.emit(job_id, "entries", entries=entries)
+            options["entries_chunk_size"] = chunk_size
+        
+        self.emit(job_id, "accepted")
+        try:
+            result = self.generator.generate_timetable(algorithm, courses, faculty, rooms, time_slots,
+                                                       on_progress=self._throttled_progress(job_id),
+                                                       student_courses=student_courses, **options)
+        except Exception as e:
+            # Failures outside the solve itself (e.g. the cache's database) fail this job, not the service
+            self.emit(job_id, "error", error=f"Generation failed: {e}")
+            return
+        self.emit(job_id, "result", result=result)
+    
+    def _throttled_progress(self, job_id: Optional[str]) -> Callable[[Dict], None]:
+        """Progress callback that emits at most one event per progress_interval"""
+        last_emit = [0.0]
+        
+        def on_progress(progress: Dict):
+            now = time.monotonic()
+            if now - last_emit[0] >= self.progress_interval:
+                last_emit[0] = now
+                self.emit(job_id, "progress", **progress)
+        
+        return on_progress
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Timetable solver service (JSON lines on stdin/stdout)")
+    parser.add_argument("--progress-interval", type=float, default=0.25,
+                        help="minimum seconds between progress events of a job")
+    parser.add_argument("--cache", metavar="PATH", help="SQLite file for the persistent solve cache")
+    args = parser.parse_args(argv)
+    
+    cache = None
+    if args.cache:
+        from timetable_cache import TimetableCache
+        cache = TimetableCache(args.cache)
+    
+    SolverService(progress_interval=args.progress_interval, cache=cache).serve(sys.stdin)
+
+if __name__ == "__main__":
+    main()